@@ -0,0 +1,325 @@
+"""
+Benchmark runner for the Queens, Zip and Tango solvers.
+
+Every game gets a fixed, seeded corpus at several sizes and difficulties
+(plus a few known pathological boards), so two runs of the same code see
+exactly the same puzzles. For each solver and corpus group it reports
+wall-clock percentiles, nodes explored, nodes per second and peak memory.
+
+    python benchmarks.py                      # full run, table on stdout
+    python benchmarks.py --quick --out base.json
+    python benchmarks.py --compare base.json  # exit code 1 on regressions
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import queens_solver
+from solver_stats import SolverStats
+import tango_solver
+import zip_solver
+
+
+# ---- Corpora ----
+
+def queens_corpus(quick=False):
+    """(group, regions) pairs: unique generated boards plus pathological ones."""
+    cases = []
+    sizes = (6, 8) if quick else (6, 8, 10)
+    count = 3 if quick else 10
+    for size in sizes:
+        rng = random.Random(1000 + size)
+        for _ in range(count):
+            regions = queens_solver.generate_random_regions(size, rng=rng)
+            if regions is not None:
+                cases.append((f"queens-{size}", regions))
+    # Unsatisfiable: row 0 is split between two regions that fit nowhere else
+    for size in (8,) if quick else (8, 10):
+        regions = [[0 if c < size // 2 else 1 for c in range(size)]]
+        regions += [[2 + (r + c) % (size - 2) for c in range(size)] for r in range(1, size)]
+        cases.append((f"queens-{size}-unsat", regions))
+    # Plain columns: every permutation without touching diagonals is legal,
+    # so naive searches wander through many near-solutions
+    size = 10 if quick else 12
+    cases.append((f"queens-{size}-columns", [[c for c in range(size)] for _ in range(size)]))
+    return cases
+
+
+def hamiltonian_path(height, width, rng, moves=None):
+    """Random Hamiltonian path of the grid via backbite moves on a serpentine."""
+    # Deliberately not zip_solver.random_hamiltonian_path: the Zip corpus
+    # must stay the same puzzles across commits so saved baselines remain
+    # comparable, and that function may be retuned for the generator.
+    path = []
+    for r in range(height):
+        row = [(r, c) for c in range(width)]
+        path += row if r % 2 == 0 else row[::-1]
+    moves = moves or 10 * height * width
+    for _ in range(moves):
+        if rng.random() < 0.5:
+            path.reverse()
+        r, c = path[-1]
+        options = [(r + dr, c + dc) for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if 0 <= r + dr < height and 0 <= c + dc < width]
+        i = path.index(rng.choice(options))
+        if i != len(path) - 2:
+            path = path[:i + 1] + path[i + 1:][::-1]
+    return path
+
+
+def zip_corpus(quick=False):
+    """(group, grid) pairs: random paths with many (easy) or few (hard) givens."""
+    cases = []
+    sizes = (6,) if quick else (6, 8)
+    count = 3 if quick else 10
+    for size in sizes:
+        for label, extra in (("easy", size * 2), ("hard", size // 2)):
+            rng = random.Random(2000 + size * 10 + extra)
+            for _ in range(count):
+                path = hamiltonian_path(size, size, rng)
+                grid = [[0] * size for _ in range(size)]
+                for num in [1, size * size] + rng.sample(range(2, size * size), extra):
+                    r, c = path[num - 1]
+                    grid[r][c] = num
+                cases.append((f"zip-{size}-{label}", grid))
+    # Sparse: only the endpoints and one given between them
+    rng = random.Random(2070)
+    for _ in range(2 if quick else 5):
+        path = hamiltonian_path(7, 7, rng)
+        grid = [[0] * 7 for _ in range(7)]
+        for num in (1, rng.randrange(2, 49), 49):
+            r, c = path[num - 1]
+            grid[r][c] = num
+        cases.append(("zip-7-sparse", grid))
+    # Long serpentine with givens only at the row ends
+    size = 20 if quick else 40
+    grid = [[0] * size for _ in range(size)]
+    num = 1
+    for r in range(size):
+        cols = range(size) if r % 2 == 0 else range(size - 1, -1, -1)
+        for i, c in enumerate(cols):
+            if i in (0, size - 1):
+                grid[r][c] = num
+            num += 1
+    cases.append((f"zip-{size}-serpentine", grid))
+    # Unsatisfiable: 2 is given two steps away from 1
+    grid = [[0] * 6 for _ in range(6)]
+    grid[0][0], grid[0][2], grid[5][5] = 1, 2, 36
+    cases.append(("zip-6-unsat", grid))
+    return cases
+
+
+def tango_corpus(quick=False):
+    """(group, (grid, equals, opps)) pairs: generated unique puzzles plus edge cases."""
+    cases = []
+    sizes = (6, 8) if quick else (6, 8, 10)
+    count = 3 if quick else 10
+    for size in sizes:
+        rng = random.Random(3000 + size)
+        for _ in range(count):
+            grid, equals, opps, _ = tango_solver.generate_puzzle(size, rng=rng)
+            cases.append((f"tango-{size}", (grid, equals, opps)))
+    size = 10 if quick else 12
+    cases.append((f"tango-{size}-empty", ([[None] * size for _ in range(size)], [], [])))
+    # Unsatisfiable only deep down: a contradictory pair far from any given
+    grid = [[None] * 6 for _ in range(6)]
+    cases.append(("tango-6-unsat", (grid, [(0, 0, 0, 1), (0, 1, 0, 2)], [])))
+    return cases
+
+
+# ---- Solvers under test: name -> (game, fn(case, stats) -> result) ----
+
+def run_queens(engine):
+    def solve(regions, stats):
+        return queens_solver.solve_queens(regions, engine=engine, stats=stats)
+    return solve
+
+
+def run_zip(fn, counted):
+    def solve(grid, stats):
+        if counted:
+            return fn(grid, time_limit=10, stats=stats)
+        return fn(grid, time_limit=10)
+    return solve
+
+
+def run_tango(engine):
+    def solve(case, stats):
+        grid, equals, opps = case
+        return tango_solver.solve_grid(grid, equals, opps, engine=engine, stats=stats)
+    return solve
+
+
+SOLVERS = {
+    'queens.bitmask': ('queens', run_queens('bitmask')),
+    'queens.csp': ('queens', run_queens('csp')),
+    'queens.dlx': ('queens', run_queens('dlx')),
+    'zip.restarts': ('zip', run_zip(zip_solver.solve_zip, counted=True)),
+    'zip.segments': ('zip', run_zip(zip_solver.solve_zip_segments, counted=False)),
+    'tango.bitmask': ('tango', run_tango('bitmask')),
+    'tango.csp': ('tango', run_tango('csp')),
+}
+
+CORPORA = {'queens': queens_corpus, 'zip': zip_corpus, 'tango': tango_corpus}
+
+
+# ---- Measurement ----
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def measure(solve, case, repeat):
+    """Best-of-repeat wall time, node count (None if not reported) and peak bytes."""
+    times = []
+    nodes = None
+    outcome = 'solved'
+    for _ in range(repeat):
+        stats = SolverStats()
+        start = time.perf_counter()
+        try:
+            result = solve(case, stats)
+        except zip_solver.ZipTimeout:
+            result, outcome = None, 'timeout'
+        times.append(time.perf_counter() - start)
+        if result is None and outcome != 'timeout':
+            outcome = 'unsolved'
+        nodes = stats.get('nodes', nodes)
+    tracemalloc.start()
+    try:
+        solve(case, SolverStats())
+    except zip_solver.ZipTimeout:
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), nodes, peak, outcome
+
+
+def summarize(samples):
+    times = [s[0] for s in samples]
+    nodes = [s[1] for s in samples if s[1] is not None]
+    total_time = sum(times)
+    summary = {
+        'cases': len(samples),
+        'p50_ms': percentile(times, 50) * 1e3,
+        'p90_ms': percentile(times, 90) * 1e3,
+        'p99_ms': percentile(times, 99) * 1e3,
+        'max_ms': max(times) * 1e3,
+        'total_ms': total_time * 1e3,
+        'nodes': sum(nodes) if nodes else None,
+        'nodes_per_s': sum(nodes) / total_time if nodes and total_time else None,
+        'peak_kb': max(s[2] for s in samples) / 1024,
+        'unsolved': sum(1 for s in samples if s[3] == 'unsolved'),
+        'timeouts': sum(1 for s in samples if s[3] == 'timeout'),
+    }
+    return summary
+
+
+def run(solver_names, quick=False, repeat=3, log=print):
+    """Benchmark the named solvers; returns the JSON-ready result document."""
+    corpora = {}
+    results = {}
+    for name in solver_names:
+        game, solve = SOLVERS[name]
+        if game not in corpora:
+            corpora[game] = CORPORA[game](quick)
+        groups = {}
+        for group, case in corpora[game]:
+            groups.setdefault(group, []).append(measure(solve, case, repeat))
+        results[name] = {group: summarize(samples) for group, samples in groups.items()}
+        for group, summary in results[name].items():
+            log(format_row(name, group, summary))
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': quick,
+            'repeat': repeat,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def format_row(name, group, s):
+    nodes = '-' if s['nodes'] is None else f"{s['nodes']:>9}"
+    rate = '-' if s['nodes_per_s'] is None else f"{s['nodes_per_s']:>10.0f}"
+    flags = ''
+    if s['unsolved']:
+        flags += f" unsolved={s['unsolved']}"
+    if s['timeouts']:
+        flags += f" timeouts={s['timeouts']}"
+    return (f"{name:<15} {group:<22} n={s['cases']:<3} p50={s['p50_ms']:8.2f}ms "
+            f"p90={s['p90_ms']:8.2f}ms max={s['max_ms']:8.2f}ms nodes={nodes} "
+            f"nodes/s={rate} peak={s['peak_kb']:8.1f}KB{flags}")
+
+
+def compare(baseline, current, threshold=0.2, min_ms=1.0):
+    """
+    Regressions of current against baseline.
+
+    A group regresses when its p50 or p90 grows by more than threshold
+    (relative) and by at least min_ms, when its node count grows by more
+    than threshold, or when it gains timeouts or unsolved cases.
+    """
+    problems = []
+    for name, groups in current['results'].items():
+        for group, now in groups.items():
+            before = baseline.get('results', {}).get(name, {}).get(group)
+            if before is None:
+                continue
+            for key in ('p50_ms', 'p90_ms'):
+                if now[key] > before[key] * (1 + threshold) and now[key] - before[key] >= min_ms:
+                    problems.append(f"{name} {group}: {key} {before[key]:.2f} -> {now[key]:.2f}")
+            if before['nodes'] and now['nodes'] and now['nodes'] > before['nodes'] * (1 + threshold):
+                problems.append(f"{name} {group}: nodes {before['nodes']} -> {now['nodes']}")
+            for key in ('timeouts', 'unsolved'):
+                if now[key] > before[key]:
+                    problems.append(f"{name} {group}: {key} {before[key]} -> {now[key]}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--solvers', nargs='+', default=list(SOLVERS),
+                        help='Solvers to run (default: all): ' + ', '.join(SOLVERS))
+    parser.add_argument('--games', nargs='+', choices=sorted(CORPORA),
+                        help='Only run the solvers of these games')
+    parser.add_argument('--quick', action='store_true', help='Smaller corpus for a fast check')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case (best is kept)')
+    parser.add_argument('--out', help='Write the results as JSON to this file')
+    parser.add_argument('--compare', metavar='BASELINE', help='Flag regressions against a saved JSON run')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown that counts as a regression (default 0.2)')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.solvers if name not in SOLVERS]
+    if unknown:
+        parser.error(f"Unknown solvers: {', '.join(unknown)}")
+    names = [name for name in args.solvers if not args.games or SOLVERS[name][0] in args.games]
+    document = run(names, quick=args.quick, repeat=args.repeat)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(document, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        problems = compare(baseline, document, threshold=args.threshold)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Streaming bulk solver for JSONL puzzle files.
+
+Reads one puzzle record per line, lazily, sends each to a worker process
+according to its "game" field and writes one result line per record as
+soon as it is ready. At most --in-flight records are outstanding at any
+time, so memory stays flat however large the input is.
+
+Input records:
+
+    {"id": 1, "game": "queens", "regions": [[...]]}
+    {"id": 2, "game": "zip", "grid": [[...]]}
+    {"id": 3, "game": "tango", "grid": [[...]], "equals": [[r1, c1, r2, c2]], "opps": []}
+
+An optional "engine" picks the Queens / Tango engine. Output records:
+
+    {"id": 1, "line": 1, "game": "queens", "status": "solved", "result": ...,
+     "elapsed_ms": 0.4, "stats": {"counters": {"nodes": 12, ...}, "phases_ms": {"search": 0.3}}}
+
+status is 'solved', 'unsolvable', 'timeout', 'unknown' (Queens local
+search gave up; it cannot prove a board unsolvable) or 'error' (with an
+"error" message). With --time-limit every record stops at that many
+seconds. Zip results are [[r, c], ...] paths.
+
+    python bulk_solve.py puzzles.jsonl -o results.jsonl --workers 4
+    cat puzzles.jsonl | python bulk_solve.py - > results.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import queens_solver
+import tango_solver
+import zip_solver
+from solver_stats import SolverStats
+
+
+class Inconclusive(Exception):
+    """Raised when an incomplete engine gives up without proving the record unsolvable"""
+
+
+def run_steps(steps, stats):
+    """Run a stepping solve to its final report as the 'search' phase; TimeoutError if it ran out of time."""
+    with stats.phase('search'):
+        for report in steps:
+            if report['done']:
+                if report['status'] == 'timeout':
+                    raise TimeoutError('Solve timed out')
+                return report['result']
+
+
+def solve_queens_record(record, stats, time_limit):
+    regions, engine = record['regions'], record.get('engine', 'bitmask')
+    if engine == 'local':
+        with stats.phase('search'):
+            result = queens_solver.solve_queens_local_search(regions, time_limit=time_limit)
+        if result is None:
+            raise Inconclusive('local search gave up')
+        return result
+    if time_limit is None:
+        return queens_solver.solve_queens(regions, engine=engine, stats=stats)
+    return run_steps(queens_solver.solve_queens_steps(regions, time_limit=time_limit, engine=engine,
+                                                      stats=stats), stats)
+
+
+def solve_zip_record(record, stats, time_limit):
+    solution = zip_solver.solve_zip(record['grid'], time_limit=time_limit, stats=stats)
+    return None if solution is None else [list(solution[num]) for num in sorted(solution)]
+
+
+def solve_tango_record(record, stats, time_limit):
+    puzzle = (record['grid'], record.get('equals', []), record.get('opps', []))
+    engine = record.get('engine', 'bitmask')
+    if time_limit is None:
+        return tango_solver.solve_grid(*puzzle, engine=engine, stats=stats)
+    return run_steps(tango_solver.solve_grid_steps(*puzzle, engine=engine, time_limit=time_limit,
+                                                   stats=stats), stats)
+
+
+SOLVERS = {'queens': solve_queens_record, 'zip': solve_zip_record, 'tango': solve_tango_record}
+
+
+def solve_line(line_no, line, time_limit=None):
+    """Worker entry point: parse one JSONL line and solve it; returns (status, output line)."""
+    start = time.perf_counter()
+    out = {'id': None, 'line': line_no, 'game': None}
+    stats = SolverStats()
+    try:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError('record must be a JSON object')
+        out['id'] = record.get('id')
+        out['game'] = game = record.get('game')
+        if game not in SOLVERS:
+            raise ValueError(f"unknown game {game!r}")
+        result = SOLVERS[game](record, stats, time_limit)
+        out['status'] = 'unsolvable' if result is None else 'solved'
+        out['result'] = result
+    except TimeoutError:  # includes zip_solver.ZipTimeout
+        out['status'] = 'timeout'
+        out['result'] = None
+    except Inconclusive:
+        out['status'] = 'unknown'
+        out['result'] = None
+    except Exception as error:  # one bad record must not end the run
+        out['status'] = 'error'
+        out['error'] = f"{type(error).__name__}: {error}"
+    out['elapsed_ms'] = round((time.perf_counter() - start) * 1e3, 3)
+    out['stats'] = stats.summary()
+    return out['status'], json.dumps(out)
+
+
+def read_records(stream):
+    """(line number, text) for every non-blank line, read lazily."""
+    for line_no, line in enumerate(stream, 1):
+        if line.strip():
+            yield line_no, line
+
+
+def bulk_solve(lines, write, workers=None, in_flight=None, ordered=False, time_limit=None):
+    """
+    Solve (line number, text) records with a bounded number outstanding.
+
+    Args:
+        lines: Iterable of (line number, JSONL text)
+        write: Called with each output line (without newline)
+        workers: Worker processes (default: CPU count)
+        in_flight: Maximum records submitted but not yet written (default: 4 per worker)
+        ordered: Write results in input order (waits on the oldest record)
+        time_limit: Optional seconds per record
+
+    Returns:
+        dict: Number of output records per status
+    """
+    workers = workers or os.cpu_count() or 1
+    in_flight = in_flight or 4 * workers
+    counts = {}
+    pending = deque()
+
+    def drain(limit):
+        """Write finished records until at most limit are outstanding."""
+        while len(pending) > limit:
+            if ordered:
+                finished = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                finished = [future for future in pending if future in done]
+                for future in finished:
+                    pending.remove(future)
+            for future in finished:
+                status, text = future.result()
+                counts[status] = counts.get(status, 0) + 1
+                write(text)
+
+    with ProcessPoolExecutor(workers) as pool:
+        for line_no, line in lines:
+            drain(in_flight - 1)
+            pending.append(pool.submit(solve_line, line_no, line, time_limit))
+        drain(0)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solve a JSONL file of Queens / Zip / Tango puzzles')
+    parser.add_argument('input', help="JSONL input file ('-' for stdin)")
+    parser.add_argument('-o', '--output', help='JSONL output file (default: stdout)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--in-flight', type=int, help='Records outstanding at once (default: 4 per worker)')
+    parser.add_argument('--ordered', action='store_true', help='Write results in input order')
+    parser.add_argument('--time-limit', type=float, help='Seconds per record before status timeout')
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    sink = sys.stdout if args.output is None else open(args.output, 'w')
+    start = time.perf_counter()
+    try:
+        counts = bulk_solve(read_records(source), lambda text: sink.write(text + '\n'),
+                            args.workers, args.in_flight, args.ordered, args.time_limit)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    total = sum(counts.values())
+    elapsed = time.perf_counter() - start
+    summary = ', '.join(f"{status}={count}" for status, count in sorted(counts.items()))
+    print(f"{total} records in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.1f}/s): {summary}",
+          file=sys.stderr)
+    return 0 if not counts.get('error') else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Portfolio solving: race differently configured solvers for one board.
+
+Each game has a few variants that explore the search space in different
+orders (engines, restart schedules, shuffled value orders). A Portfolio
+starts all of a game's variants on the same board in a process pool,
+returns the first answer that passes the game's validator and cancels the
+rest. Wins are counted per variant (and optionally appended to a JSONL log)
+so the defaults can be tuned from real traffic.
+
+Variants built on a stepping API or ticking solution generator stop at
+their next step once a race is decided; Zip segments finishes in its worker
+(bounded by the race timeout) and its answer is discarded. A variant that
+raises is counted as failed and the race goes on without it.
+
+    with Portfolio() as portfolio:
+        outcome = portfolio.solve('zip', grid, timeout=10)
+        outcome.result, outcome.winner
+"""
+
+import json
+import multiprocessing
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import NamedTuple
+
+import queens_solver
+import tango_solver
+import zip_solver
+from solver_stats import stepped
+
+STEP_NODES = 2000
+
+
+class Cancelled(Exception):
+    """Raised inside a worker when its race was already decided"""
+
+
+def drive(steps, cancel):
+    """Run a stepping generator to its final report, checking cancel between steps."""
+    for report in steps:
+        if report['done']:
+            return report['result']
+        if cancel.is_set():
+            steps.close()
+            raise Cancelled
+
+
+def first_solution(solutions, cancel):
+    """First solution from a generator that also yields None ticks, checking cancel at each tick."""
+    for cells in solutions:
+        if cells is not None:
+            solutions.close()
+            return cells
+        if cancel.is_set():
+            solutions.close()
+            raise Cancelled
+    return None
+
+
+def queens_cells(cells, n):
+    return None if cells is None else [{'row': cell // n, 'col': cell % n} for cell in sorted(cells)]
+
+
+# ---- Variants: fn(puzzle, cancel, time_limit) -> result ----
+
+def queens_bitmask(regions, cancel, time_limit):
+    return drive(queens_solver.solve_queens_steps(regions, every=STEP_NODES), cancel)
+
+
+def queens_csp(regions, cancel, time_limit):
+    domains = queens_solver.QueensDomains(regions)
+    if domains.num_regions != domains.n or not domains.propagate():
+        return None
+    # Propagating nodes cost far more than bitmask ones, so check cancel more often
+    return queens_cells(first_solution(domains.solutions(STEP_NODES // 20), cancel), domains.n)
+
+
+def queens_dlx(regions, cancel, time_limit):
+    dlx = queens_solver.QueensDLX(regions)
+    if dlx.num_regions != dlx.n:
+        return None
+    return queens_cells(first_solution(dlx.solutions(STEP_NODES), cancel), dlx.n)
+
+
+def zip_restarts(grid, cancel, time_limit):
+    return drive(zip_solver.solve_zip_steps(grid, every=STEP_NODES), cancel)
+
+
+def zip_rapid_restarts(grid, cancel, time_limit):
+    # Short Luby unit: the first (ordered) attempt is cut off early and the
+    # search is dominated by randomized restarts
+    H, W = len(grid), len(grid[0])
+    search = zip_solver.restart_search(grid, node_unit=16 * H * W, seed=1, every=STEP_NODES)
+    return drive(stepped(search, STEP_NODES), cancel)
+
+
+def zip_segments(grid, cancel, time_limit):
+    try:
+        return zip_solver.solve_zip_segments(grid, time_limit=time_limit)
+    except zip_solver.ZipTimeout:
+        raise Cancelled
+
+
+def tango_bitmask(puzzle, cancel, time_limit):
+    return drive(tango_solver.solve_grid_steps(*puzzle, engine='bitmask'), cancel)
+
+
+def tango_csp(puzzle, cancel, time_limit):
+    return drive(tango_solver.solve_grid_steps(*puzzle, engine='csp'), cancel)
+
+
+def tango_shuffled(puzzle, cancel, time_limit):
+    return drive(tango_solver.solve_grid_steps(*puzzle, engine='bitmask', rng=random.Random(1)), cancel)
+
+
+VARIANTS = {
+    'queens': {'bitmask': queens_bitmask, 'csp': queens_csp, 'dlx': queens_dlx},
+    'zip': {'restarts': zip_restarts, 'rapid-restarts': zip_rapid_restarts, 'segments': zip_segments},
+    'tango': {'bitmask': tango_bitmask, 'csp': tango_csp, 'shuffled': tango_shuffled},
+}
+
+
+# ---- Validators: is result a correct answer for puzzle? ----
+
+def valid_queens(regions, result):
+    return queens_solver.validate_solution(result, regions)
+
+
+def valid_zip(grid, result):
+    H, W = len(grid), len(grid[0])
+    if sorted(result) != list(range(1, H * W + 1)) or len(set(result.values())) != H * W:
+        return False
+    for num, (r, c) in result.items():
+        if not (0 <= r < H and 0 <= c < W) or grid[r][c] not in (0, num):
+            return False
+        if num > 1:
+            pr, pc = result[num - 1]
+            if abs(pr - r) + abs(pc - c) != 1:
+                return False
+    return True
+
+
+def valid_tango(puzzle, result):
+    grid, equals, opps = puzzle
+    n = len(grid)
+    return (len(result) == n and tango_solver.solved(result, equals, opps)
+            and all(grid[r][c] in (None, result[r][c]) for r in range(n) for c in range(n)))
+
+
+VALIDATORS = {'queens': valid_queens, 'zip': valid_zip, 'tango': valid_tango}
+
+
+def run_variant(game, name, puzzle, cancel, time_limit):
+    """Worker entry point: ('ok', result, seconds) or ('cancelled', None, seconds)."""
+    start = time.perf_counter()
+    try:
+        result = VARIANTS[game][name](puzzle, cancel, time_limit)
+    except Cancelled:
+        return 'cancelled', None, time.perf_counter() - start
+    return 'ok', result, time.perf_counter() - start
+
+
+class PortfolioResult(NamedTuple):
+    status: str        # 'solved', 'unsolvable', 'timeout' or 'failed' (no variant produced a valid answer)
+    result: object     # solution in the game's usual format, or None
+    winner: str        # variant that answered first (None unless solved / unsolvable)
+    elapsed: float     # wall-clock seconds for the race
+
+
+class Portfolio:
+    """
+    Process pool that races solver variants and keeps score.
+
+    Args:
+        workers: Pool size (default: the largest variant count, so a whole
+                 race runs at once even if the CPUs have to time-slice it)
+        log_path: Optional JSONL file; one line per race with game, winner,
+                  status and elapsed seconds
+    """
+
+    def __init__(self, workers=None, log_path=None):
+        most = max(len(variants) for variants in VARIANTS.values())
+        self.workers = workers or most
+        self.log_path = log_path
+        self.manager = multiprocessing.Manager()
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.wins = {game: dict.fromkeys(variants, 0) for game, variants in VARIANTS.items()}
+        self.failures = {game: dict.fromkeys(variants, 0) for game, variants in VARIANTS.items()}
+
+    def solve(self, game, puzzle, variants=None, timeout=None):
+        """
+        Race the game's variants on puzzle; the first validated answer wins.
+
+        A None answer (no solution) from a variant counts as soon as it
+        arrives: every variant is a complete search. A variant that raises
+        is recorded in self.failures (and the log) and the others race on.
+
+        Args:
+            game: 'queens', 'zip' or 'tango'
+            puzzle: regions (queens), grid (zip) or (grid, equals, opps) (tango)
+            variants: Optional subset of VARIANTS[game] names to race
+            timeout: Optional seconds before giving up with status 'timeout'
+
+        Returns:
+            PortfolioResult
+        """
+        names = list(variants or VARIANTS[game])
+        validate = VALIDATORS[game]
+        cancel = self.manager.Event()
+        start = time.perf_counter()
+        pending = {self.pool.submit(run_variant, game, name, puzzle, cancel, timeout): name
+                   for name in names}
+        outcome = None
+        failed = {}
+        deadline = None if timeout is None else start + timeout
+        try:
+            while pending and outcome is None:
+                left = None if deadline is None else max(0.0, deadline - time.perf_counter())
+                done, _ = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        status, result, _ = future.result()
+                    except Exception as error:  # one broken variant must not end the race
+                        failed[name] = f"{type(error).__name__}: {error}"
+                        self.failures[game][name] += 1
+                        continue
+                    if status != 'ok':
+                        continue
+                    if result is None:
+                        outcome = PortfolioResult('unsolvable', None, name, 0.0)
+                    elif validate(puzzle, result):
+                        outcome = PortfolioResult('solved', result, name, 0.0)
+                    if outcome is not None:
+                        break
+        finally:
+            cancel.set()
+            for future in pending:
+                future.cancel()
+        elapsed = time.perf_counter() - start
+        if outcome is None:
+            outcome = PortfolioResult('timeout' if pending else 'failed', None, None, elapsed)
+        else:
+            outcome = outcome._replace(elapsed=elapsed)
+            self.wins[game][outcome.winner] += 1
+        if self.log_path:
+            with open(self.log_path, 'a') as log:
+                log.write(json.dumps({'game': game, 'status': outcome.status, 'winner': outcome.winner,
+                                      'elapsed': round(elapsed, 6), 'variants': names,
+                                      'failed': failed}) + '\n')
+        return outcome
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        self.manager.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
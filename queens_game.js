@@ -31,6 +31,10 @@ async function initPyodide() {
     try {
         gameState.pyodide = await loadPyodide();
         
+        // The solver imports its instrumentation module from the virtual FS
+        const statsCode = await (await fetch('solver_stats.py')).text();
+        gameState.pyodide.FS.writeFile('solver_stats.py', statsCode);
+
         // Load the Python solver code
         const response = await fetch('queens_solver.py');
         const pythonCode = await response.text();
@@ -366,7 +370,11 @@ async function getHint() {
 import json
 regions = json.loads('${regionsStr}')
 queens = json.loads('${queensStr}')
-result = get_hint(regions, queens)
+# One session per board: hints only pay for the moves made since the last one
+if globals().get('hint_session') is None or hint_session.regions != regions:
+    hint_session = QueensSession(regions)
+hint_session.sync(queens)
+result = hint_session.hint()
 json.dumps(result)
             `);
             
@@ -423,15 +431,8 @@ async function solvePuzzle() {
         let solution;
         
         if (gameState.pyodide) {
-            // Use Python solver
-            const regionsStr = JSON.stringify(gameState.regions);
-            const resultStr = await gameState.pyodide.runPythonAsync(`
-import json
-regions = json.loads('${regionsStr}')
-result = solve_queens(regions)
-json.dumps(result)
-            `);
-            solution = JSON.parse(resultStr);
+            // Use Python solver, stepped so large boards do not freeze the page
+            solution = await solveQueensStepped(gameState.regions);
         } else {
             // Fallback: JavaScript solver
             solution = await solveQueensJS(gameState.regions);
@@ -467,6 +468,37 @@ json.dumps(result)
     updateBoard();
 }
 
+// Run the Python solver through solve_queens_steps, handing control back
+// to the browser between steps and reporting progress
+async function solveQueensStepped(regions) {
+    const py = gameState.pyodide;
+    const solveSteps = py.globals.get('solve_queens_steps');
+    const pyRegions = py.toPy(regions);
+    const steps = solveSteps(pyRegions);
+    try {
+        while (true) {
+            const report = steps.next().value;
+            if (report.get('done')) {
+                const result = report.get('result');
+                report.destroy();
+                if (!result) return null;
+                const solution = result.toJs({ dict_converter: Object.fromEntries });
+                result.destroy();
+                return solution;
+            }
+            updateAIProgress(`AI solving puzzle... (${report.get('nodes')} placements)`);
+            report.destroy();
+            await new Promise(resolve => setTimeout(resolve, 0));
+        }
+    } finally {
+        // Closes the Python generator if the loop ends early
+        steps.return();
+        steps.destroy();
+        pyRegions.destroy();
+        solveSteps.destroy();
+    }
+}
+
 // JavaScript fallback solver using CSP with Forward Checking and MRV
 function solveQueensJS(regions) {
     function getRowDomains(row, queens) {
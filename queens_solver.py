@@ -2,8 +2,17 @@
 Queens Puzzle Solver - Advanced AI Algorithm
 Uses Backtracking with Forward Checking and MRV heuristic
 Solves the Queens puzzle with region constraints as a CSP
+
+The default engine (QueensBitboard) keeps the board as integer bitmasks;
+the dict-based helpers below are kept for the reference CSP solver.
 """
 
+import random
+import time
+
+from solver_stats import SolverStats, stepped
+
+
 def get_domain(row, col, queens, regions, board_size):
     """
     Get the valid domain (possible values) for a cell position.
@@ -138,125 +147,1376 @@ def forward_check(row, col, queens, regions, board_size):
     return True
 
 
-def solve_queens_csp(regions, queens=None):
+# Row, column and row/column/neighbour kill masks, shared by every board of a size
+BOARD_GEOMETRY = {}
+
+
+def board_geometry(n):
+    """
+    Region-independent bitmasks for an n x n board (computed once per size).
+
+    Returns:
+        tuple: (row_masks, col_masks, line_kill_masks)
+    """
+    if n not in BOARD_GEOMETRY:
+        row_bits = (1 << n) - 1
+        col_bits = sum(1 << (r * n) for r in range(n))
+        row_masks = [row_bits << (r * n) for r in range(n)]
+        col_masks = [col_bits << c for c in range(n)]
+        line_kill = []
+        for r in range(n):
+            for c in range(n):
+                mask = row_masks[r] | col_masks[c]
+                for nr in range(max(0, r - 1), min(n, r + 2)):
+                    for nc in range(max(0, c - 1), min(n, c + 2)):
+                        mask |= 1 << (nr * n + nc)
+                line_kill.append(mask)
+        BOARD_GEOMETRY[n] = (row_masks, col_masks, line_kill)
+    return BOARD_GEOMETRY[n]
+
+
+class QueensMasks:
+    """
+    Static bitmask geometry shared by the bitmask engines.
+
+    Cells are numbered row * n + col. Region labels (any hashable) are
+    mapped to dense indices in row-major order of first appearance.
+    A label of None marks a hole: a cell in no region that can never hold
+    a queen (the region generator uses these while growing a layout).
+    """
+
+    def __init__(self, regions):
+        n = len(regions)
+        self.n = n
+
+        region_ids = {}
+        self.cell_region = []
+        self.holes = 0
+        for r in range(n):
+            for c in range(n):
+                label = regions[r][c]
+                if label is None:
+                    self.cell_region.append(-1)
+                    self.holes |= 1 << (r * n + c)
+                    continue
+                if label not in region_ids:
+                    region_ids[label] = len(region_ids)
+                self.cell_region.append(region_ids[label])
+        self.num_regions = len(region_ids)
+
+        self.row_masks, self.col_masks, line_kill = board_geometry(n)
+        self.region_masks = [0] * self.num_regions
+        for cell, k in enumerate(self.cell_region):
+            if k >= 0:
+                self.region_masks[k] |= 1 << cell
+
+        # Cells ruled out by a queen on each cell (row, col, region, neighbours).
+        # The relation is symmetric: x rules out y exactly when y rules out x.
+        self.kill_masks = [line_kill[cell] | (self.region_masks[k] if k >= 0 else 0)
+                           for cell, k in enumerate(self.cell_region)]
+
+
+class QueensDomains(QueensMasks):
+    """
+    Incrementally maintained candidate sets for the Queens CSP.
+
+    Keeps, for every row, column and region, the bitmask of cells that can
+    still hold its queen. Placing a queen removes only the cells it rules
+    out and records each removal on a trail; backtracking pops the trail
+    back to a saved mark instead of rebuilding or copying any state.
+    """
+
+    def __init__(self, regions):
+        super().__init__(regions)
+        n = self.n
+
+        # Candidate sets: row -> column bits, column -> row bits, region -> cell bits
+        self.row_cands = [(1 << n) - 1] * n
+        self.col_cands = [(1 << n) - 1] * n
+        self.region_cands = list(self.region_masks)
+        self.alive = ((1 << (n * n)) - 1) & ~self.holes
+        holes = self.holes
+        while holes:
+            low = holes & -holes
+            r, c = divmod(low.bit_length() - 1, n)
+            self.row_cands[r] &= ~(1 << c)
+            self.col_cands[c] &= ~(1 << r)
+            holes ^= low
+
+        self.rows_done = 0
+        self.cols_done = 0
+        self.regions_done = 0
+        self.queens = []
+        # Removed cells are stored as-is, placements as ~cell (negative)
+        self.trail = []
+        self.nodes = self.backtracks = 0  # Assignments tried and undone by solutions()
+
+    def mark(self):
+        """Return a trail position that undo_to() can restore."""
+        return len(self.trail)
+
+    def undo_to(self, mark):
+        """Restore the state recorded at a trail mark."""
+        n = self.n
+        trail = self.trail
+        while len(trail) > mark:
+            entry = trail.pop()
+            if entry >= 0:
+                r, c = divmod(entry, n)
+                self.row_cands[r] |= 1 << c
+                self.col_cands[c] |= 1 << r
+                self.region_cands[self.cell_region[entry]] |= 1 << entry
+                self.alive |= 1 << entry
+            else:
+                cell = ~entry
+                r, c = divmod(cell, n)
+                self.rows_done &= ~(1 << r)
+                self.cols_done &= ~(1 << c)
+                self.regions_done &= ~(1 << self.cell_region[cell])
+                self.queens.pop()
+
+    def remove(self, cell):
+        """
+        Remove a cell from every candidate set it belongs to.
+
+        Returns:
+            bool: False if an unfilled row, column or region is left empty
+        """
+        if not (self.alive >> cell) & 1:
+            return True
+        r, c = divmod(cell, self.n)
+        k = self.cell_region[cell]
+        self.trail.append(cell)
+        self.alive &= ~(1 << cell)
+        self.row_cands[r] &= ~(1 << c)
+        self.col_cands[c] &= ~(1 << r)
+        self.region_cands[k] &= ~(1 << cell)
+        if not self.row_cands[r] and not (self.rows_done >> r) & 1:
+            return False
+        if not self.col_cands[c] and not (self.cols_done >> c) & 1:
+            return False
+        if not self.region_cands[k] and not (self.regions_done >> k) & 1:
+            return False
+        return True
+
+    def assign(self, row, col):
+        """
+        Place a queen and remove every cell it rules out.
+
+        Returns:
+            bool: False if the placement wipes out some unit's candidates
+                  (the caller undoes to its mark either way)
+        """
+        n = self.n
+        cell = row * n + col
+        if not (self.alive >> cell) & 1:
+            return False
+        k = self.cell_region[cell]
+        self.trail.append(~cell)
+        self.rows_done |= 1 << row
+        self.cols_done |= 1 << col
+        self.regions_done |= 1 << k
+        self.queens.append(cell)
+
+        # Only cells still alive are visited, so the cost tracks the change
+        doomed = []
+        bits = self.row_cands[row]
+        while bits:
+            low = bits & -bits
+            doomed.append(row * n + low.bit_length() - 1)
+            bits ^= low
+        bits = self.col_cands[col]
+        while bits:
+            low = bits & -bits
+            doomed.append((low.bit_length() - 1) * n + col)
+            bits ^= low
+        bits = self.region_cands[k]
+        while bits:
+            low = bits & -bits
+            doomed.append(low.bit_length() - 1)
+            bits ^= low
+        for nr in range(max(0, row - 1), min(n, row + 2)):
+            for nc in range(max(0, col - 1), min(n, col + 2)):
+                doomed.append(nr * n + nc)
+
+        for other in doomed:
+            if not self.remove(other):
+                return False
+        return True
+
+    def propagate(self):
+        """
+        Apply the logical deduction rules to a fixpoint.
+
+        1. Singles: a row, column or region with one candidate gets its queen.
+        2. Pigeonhole: if k unfilled regions fit inside k rows (or columns),
+           those lines belong to them and every other region's cells there
+           are removed. A region confined to a single line is the k = 1 case.
+        3. Wipeout: a cell whose queen would empty some unit is removed.
+
+        All removals go on the trail, so undo_to() also reverts propagation.
+
+        Returns:
+            bool: False if the rules expose a contradiction
+        """
+        while True:
+            before = len(self.trail)
+            if not self.propagate_singles():
+                return False
+            if not self.propagate_pigeonhole(self.row_masks, self.rows_done):
+                return False
+            if not self.propagate_pigeonhole(self.col_masks, self.cols_done):
+                return False
+            if not self.propagate_wipeouts():
+                return False
+            if len(self.trail) == before:
+                return True
+
+    def propagate_singles(self):
+        """Place the queen of every unit that has exactly one candidate left."""
+        n = self.n
+        for r in range(n):
+            cols = self.row_cands[r]
+            if not (self.rows_done >> r) & 1 and cols & (cols - 1) == 0:
+                if not self.assign(r, cols.bit_length() - 1):
+                    return False
+        for c in range(n):
+            rows = self.col_cands[c]
+            if not (self.cols_done >> c) & 1 and rows & (rows - 1) == 0:
+                if not self.assign(rows.bit_length() - 1, c):
+                    return False
+        for k in range(self.num_regions):
+            cells = self.region_cands[k]
+            if not (self.regions_done >> k) & 1 and cells & (cells - 1) == 0:
+                cell = cells.bit_length() - 1
+                if not self.assign(cell // n, cell % n):
+                    return False
+        return True
+
+    def propagate_pigeonhole(self, line_masks, lines_done):
+        """
+        Pigeonhole rule between regions and one family of lines (rows or columns).
+
+        Candidate line sets are the span of every region plus every
+        contiguous band of lines, which covers the layouts LinkedIn uses.
+        """
+        n = self.n
+        spans = []
+        for k in range(self.num_regions):
+            if (self.regions_done >> k) & 1:
+                continue
+            cands = self.region_cands[k]
+            span = 0
+            for i in range(n):
+                if cands & line_masks[i]:
+                    span |= 1 << i
+            spans.append((span, cands))
+
+        open_lines = ((1 << n) - 1) & ~lines_done
+        candidates = [span for span, _ in spans]
+        for i in range(n):
+            band = 0
+            for j in range(i, n):
+                band |= (1 << j) & open_lines
+                candidates.append(band)
+
+        seen = set()
+        for lines in candidates:
+            if lines in seen:
+                continue
+            seen.add(lines)
+            size = lines.bit_count()
+            if size == 0 or lines == open_lines:
+                continue
+            count = 0
+            owned = 0
+            for span, cands in spans:
+                if span & ~lines == 0:
+                    count += 1
+                    owned |= cands
+            if count > size:
+                return False
+            if count < size:
+                continue
+            line_cells = 0
+            for i in range(n):
+                if (lines >> i) & 1:
+                    line_cells |= line_masks[i]
+            victims = line_cells & self.alive & ~owned
+            while victims:
+                low = victims & -victims
+                if not self.remove(low.bit_length() - 1):
+                    return False
+                victims ^= low
+        return True
+
+    def propagate_wipeouts(self):
+        """
+        Remove every cell whose queen would leave some unfilled unit empty.
+
+        Because ruling out is symmetric, the cells that empty a unit are the
+        intersection of the kill masks of that unit's candidates.
+        """
+        n = self.n
+        units = []
+        for r in range(n):
+            if not (self.rows_done >> r) & 1:
+                units.append(self.row_masks[r])
+        for c in range(n):
+            if not (self.cols_done >> c) & 1:
+                units.append(self.col_masks[c])
+        for k in range(self.num_regions):
+            if not (self.regions_done >> k) & 1:
+                units.append(self.region_masks[k])
+
+        for unit in units:
+            bits = unit & self.alive
+            killers = self.alive & ~unit
+            while bits and killers:
+                low = bits & -bits
+                killers &= self.kill_masks[low.bit_length() - 1]
+                bits ^= low
+            while killers:
+                low = killers & -killers
+                if not self.remove(low.bit_length() - 1):
+                    return False
+                killers ^= low
+        return True
+
+    def select_unit(self):
+        """
+        MRV over unfilled rows, columns and regions.
+
+        Returns:
+            list: Candidate cells of the most constrained unit (empty on a dead end)
+        """
+        n = self.n
+        best = None
+        best_count = n * n + 1
+        for r in range(n):
+            if (self.rows_done >> r) & 1:
+                continue
+            count = self.row_cands[r].bit_count()
+            if count < best_count:
+                best, best_count = ('row', r), count
+        for c in range(n):
+            if (self.cols_done >> c) & 1:
+                continue
+            count = self.col_cands[c].bit_count()
+            if count < best_count:
+                best, best_count = ('col', c), count
+        for k in range(self.num_regions):
+            if (self.regions_done >> k) & 1:
+                continue
+            count = self.region_cands[k].bit_count()
+            if count < best_count:
+                best, best_count = ('region', k), count
+
+        if best is None:
+            return []
+        kind, index = best
+        cells = []
+        if kind == 'row':
+            bits = self.row_cands[index]
+            while bits:
+                low = bits & -bits
+                cells.append(index * n + low.bit_length() - 1)
+                bits ^= low
+        elif kind == 'col':
+            bits = self.col_cands[index]
+            while bits:
+                low = bits & -bits
+                cells.append((low.bit_length() - 1) * n + index)
+                bits ^= low
+        else:
+            bits = self.region_cands[index]
+            while bits:
+                low = bits & -bits
+                cells.append(low.bit_length() - 1)
+                bits ^= low
+        return cells
+
+    def solutions(self, every=None):
+        """
+        Enumerate the completions of the current state, propagating at every node.
+
+        The state is restored once the generator is exhausted.
+
+        Args:
+            every: If set, also yield None after every `every` assignments
+                   so a caller can pause or cancel the search
+
+        Yields:
+            list: Sorted cell indices (row * n + col) of each solution
+        """
+        if len(self.queens) == self.n:
+            yield sorted(self.queens)
+            return
+        for cell in self.select_unit():
+            mark = self.mark()
+            self.nodes += 1
+            if every and not self.nodes % every:
+                yield None
+            if self.assign(cell // self.n, cell % self.n) and self.propagate():
+                yield from self.solutions(every)
+            self.undo_to(mark)
+            self.backtracks += 1
+
+
+def solve_queens_csp(regions, queens=None, propagate=True, stats=None):
     """
     Solve Queens puzzle using CSP with Backtracking, Forward Checking, and MRV.
     
     Algorithm:
-    1. Use MRV heuristic to select the most constrained variable (row)
-    2. For each valid value in that variable's domain
-    3. Apply Forward Checking to ensure future assignments are possible
-    4. Recursively solve remaining subproblem
-    5. Backtrack if no solution found
+    1. Propagate the pigeonhole/wipeout rules to a fixpoint (optional)
+    2. Use MRV heuristic to select the most constrained variable
+       (row, column or region)
+    3. For each cell still in that variable's domain, assign it;
+       Forward Checking removes only the cells it rules out and fails
+       as soon as some unit's domain becomes empty
+    4. Propagate again and recursively solve remaining subproblem
+    5. Backtrack by undoing the trail to the saved mark
     
     Args:
         regions: 2D list representing colored regions
-        queens: Current list of placed queens (for recursion)
+        queens: Optional list of queens that must be part of the solution
+        propagate: Run QueensDomains.propagate() before and during search
+        stats: Optional SolverStats; receives 'nodes' (search assignments),
+               'backtracks', 'eliminations' (cells removed by propagation),
+               the 'setup' and 'search' phase times and, with a trace set,
+               'node' / 'backtrack' / 'done' events
     
     Returns:
         list: Solution as list of queen positions, or None if no solution
     """
-    if queens is None:
-        queens = []
-    
-    board_size = len(regions)
-    
-    # Base case: all rows assigned
-    if len(queens) == board_size:
-        return queens
-    
-    # MRV: Select row with minimum remaining values
-    row = select_unassigned_variable_mrv(queens, regions, board_size)
-    
-    if row is None:
-        # All variables assigned
-        return queens
-    
-    # Get valid domain for selected row (Forward Checking already applied in MRV)
-    valid_cols = get_row_domains(row, queens, regions, board_size)
-    
-    # Try each value in domain
-    for col in valid_cols:
-        # Forward Checking: verify this placement doesn't eliminate all options for other rows
-        if forward_check(row, col, queens, regions, board_size):
-            # Make assignment
-            new_queens = queens + [{'row': row, 'col': col}]
-            
-            # Recursive call
-            result = solve_queens_csp(regions, new_queens)
-            
-            if result is not None:
-                return result
-            
-            # Implicit backtrack (by trying next value in loop)
-    
-    # No solution found from this state
+    started = time.perf_counter() if stats is not None else 0.0
+    trace = stats.trace if stats is not None else None
+    domains = QueensDomains(regions)
+    board_size = domains.n
+    counters = {'nodes': 0, 'backtracks': 0, 'eliminations': 0}
+
+    def run_propagation():
+        if not propagate:
+            return True
+        before = len(domains.trail)
+        ok = domains.propagate()
+        counters['eliminations'] += len(domains.trail) - before
+        return ok
+
+    def search():
+        if len(domains.queens) == board_size:
+            return True
+        for cell in domains.select_unit():
+            mark = domains.mark()
+            counters['nodes'] += 1
+            if trace is not None:
+                trace('node', {'row': cell // board_size, 'col': cell % board_size,
+                               'depth': len(domains.queens)})
+            if (domains.assign(cell // board_size, cell % board_size)
+                    and run_propagation() and search()):
+                return True
+            domains.undo_to(mark)
+            counters['backtracks'] += 1
+            if trace is not None:
+                trace('backtrack', {'row': cell // board_size, 'col': cell % board_size,
+                                    'depth': len(domains.queens)})
+        return False
+
+    solved = False
+    searching = started
+    if domains.num_regions == board_size:
+        ok = (all(domains.assign(q['row'], q['col']) for q in queens or [])
+              and run_propagation())
+        searching = time.perf_counter() if stats is not None else 0.0
+        solved = ok and search()
+    if stats is not None:
+        finished = time.perf_counter()
+        stats.add(**counters)
+        stats.add_phase('setup', searching - started)
+        stats.add_phase('search', finished - searching)
+        if trace is not None:
+            trace('done', {'solved': solved, **counters})
+    if not solved:
+        return None
+    return [{'row': cell // board_size, 'col': cell % board_size}
+            for cell in sorted(domains.queens)]
+
+
+def propagation_savings(regions):
+    """
+    Measure how much search the propagation stage saves on a board.
+
+    Args:
+        regions: 2D list representing colored regions
+
+    Returns:
+        dict: 'nodes_plain' and 'nodes_propagated' search nodes, their
+              difference 'nodes_saved', and propagation 'eliminations'
+    """
+    plain = SolverStats()
+    propagated = SolverStats()
+    solve_queens_csp(regions, propagate=False, stats=plain)
+    solve_queens_csp(regions, propagate=True, stats=propagated)
+    return {
+        'nodes_plain': plain['nodes'],
+        'nodes_propagated': propagated['nodes'],
+        'nodes_saved': plain['nodes'] - propagated['nodes'],
+        'eliminations': propagated['eliminations'],
+    }
+
+
+def enumerate_solutions_csp(regions, queens=None, limit=None):
+    """
+    Enumerate Queens solutions with the propagating CSP search.
+
+    Propagation only removes cells that belong to no solution, so the
+    enumeration is exhaustive.
+
+    Args:
+        regions: 2D list representing colored regions
+        queens: Optional list of queens that must be part of every solution
+        limit: Stop after this many solutions (None for all)
+
+    Yields:
+        list: Each solution as a list of queen positions sorted by row
+    """
+    domains = QueensDomains(regions)
+    board_size = domains.n
+    if domains.num_regions != board_size:
+        return
+    if not all(domains.assign(q['row'], q['col']) for q in queens or []):
+        return
+    if not domains.propagate():
+        return
+
+    found = 0
+    for cells in domains.solutions():
+        yield [{'row': cell // board_size, 'col': cell % board_size} for cell in cells]
+        found += 1
+        if limit is not None and found >= limit:
+            return
+
+
+def count_solutions(regions, limit=2, queens=None):
+    """
+    Count the solutions of a board, stopping early once `limit` are found.
+
+    The default limit of 2 is all a uniqueness check needs.
+
+    Args:
+        regions: 2D list representing colored regions
+        limit: Stop counting at this many solutions (None to count all)
+        queens: Optional list of queens that must be part of every solution
+
+    Returns:
+        int: Number of solutions found, capped at `limit`
+    """
+    return sum(1 for _ in enumerate_solutions_csp(regions, queens, limit))
+
+
+class QueensBitboard(QueensMasks):
+    """
+    Bitmask-backed board state for the Queens puzzle.
+
+    Every cell is one bit (index row * n + col) of a single Python integer.
+    Placing a queen clears, in one AND, every cell it rules out: its row,
+    column, region and 3x3 neighbourhood. Undo restores the previous masks
+    from a history stack, so both operations are O(1) in the number of
+    queens already placed.
+    """
+
+    def __init__(self, regions):
+        super().__init__(regions)
+        n = self.n
+        self.free = ((1 << (n * n)) - 1) & ~self.holes
+        self.rows = 0
+        self.cols = 0
+        self.used_regions = 0
+        self.queens = []
+        self._history = []
+        self.nodes = self.backtracks = 0  # Placements and dead-end undos by solutions()
+
+    def can_place(self, row, col):
+        """Return True if (row, col) is still a legal queen cell."""
+        if not (0 <= row < self.n and 0 <= col < self.n):
+            return False
+        return (self.free >> (row * self.n + col)) & 1 == 1
+
+    def place(self, row, col):
+        """Place a queen at (row, col); the caller checks legality first."""
+        self.place_cell(row * self.n + col)
+
+    def place_cell(self, cell):
+        self._history.append((self.free, self.rows, self.cols, self.used_regions))
+        row, col = divmod(cell, self.n)
+        self.free &= ~self.kill_masks[cell]
+        self.rows |= 1 << row
+        self.cols |= 1 << col
+        self.used_regions |= 1 << self.cell_region[cell]
+        self.queens.append(cell)
+
+    def undo(self):
+        """Remove the most recently placed queen."""
+        self.free, self.rows, self.cols, self.used_regions = self._history.pop()
+        self.queens.pop()
+
+    def row_candidates(self, row):
+        """Bitmask of columns still available in a row."""
+        return (self.free >> (row * self.n)) & ((1 << self.n) - 1)
+
+    def select_unit(self):
+        """
+        MRV over every unfilled row, column and region.
+
+        Returns:
+            int: Cell bitmask of the most constrained unit (0 if some unit
+                 has no candidates left, i.e. the state is a dead end)
+        """
+        free = self.free
+        best = 0
+        best_count = self.n * self.n + 1
+        for masks, done in ((self.row_masks, self.rows),
+                            (self.col_masks, self.cols),
+                            (self.region_masks, self.used_regions)):
+            for unit in masks:
+                if not done & 1:
+                    cands = free & unit
+                    count = cands.bit_count()
+                    if count < best_count:
+                        if count <= 1:
+                            # Empty unit: dead end; single candidate: forced
+                            return cands
+                        best, best_count = cands, count
+                done >>= 1
+        return best
+
+    def solutions(self, every=None):
+        """
+        Enumerate the completions of the current placement (iterative DFS).
+
+        The board holds each solution while it is yielded; once the
+        generator is exhausted the original placement is restored.
+
+        Args:
+            every: If set, also yield None after every `every` placements
+                   so a caller can pause the search (see solve_queens_steps)
+
+        Yields:
+            list: Placed cell indices of each solution
+        """
+        n = self.n
+        if self.num_regions != n:
+            return
+        if len(self.queens) == n:
+            yield self.queens
+            return
+
+        nodes = 0
+        stack = [self.select_unit()]
+        while stack:
+            cands = stack[-1]
+            if not cands:
+                stack.pop()
+                if stack:
+                    self.undo()
+                    self.backtracks += 1
+                continue
+            low = cands & -cands
+            stack[-1] = cands ^ low
+            self.place_cell(low.bit_length() - 1)
+            self.nodes += 1
+            if every:
+                nodes += 1
+                if nodes == every:
+                    nodes = 0
+                    yield None
+            if len(self.queens) == n:
+                yield self.queens
+                self.undo()
+            else:
+                stack.append(self.select_unit())
+
+    def search(self):
+        """
+        Complete the current placement with an iterative depth-first search.
+
+        Returns:
+            bool: True if the board now holds a full solution, False if the
+                  current placement cannot be extended (state is restored)
+        """
+        for _ in self.solutions():
+            return True
+        return False
+
+    def solution(self):
+        """Return the placed queens as a list of {'row', 'col'} dicts, sorted by row."""
+        return [{'row': cell // self.n, 'col': cell % self.n} for cell in sorted(self.queens)]
+
+
+def load_bitboard(regions, queens):
+    """
+    Build a QueensBitboard holding the given queens.
+
+    Returns:
+        QueensBitboard: Board state, or None if the queens conflict
+    """
+    board = QueensBitboard(regions)
+    for q in queens:
+        if not board.can_place(q['row'], q['col']):
+            return None
+        board.place(q['row'], q['col'])
+    return board
+
+
+def solve_queens_bitmask(regions, queens=None, stats=None):
+    """
+    Solve Queens puzzle with the bitmask engine (MRV over rows, columns and regions).
+
+    Args:
+        regions: 2D list representing colored regions
+        queens: Optional list of queens that must be part of the solution
+        stats: Optional SolverStats; receives 'nodes' (placements),
+               'backtracks' and the 'search' phase time
+
+    Returns:
+        list: Solution as list of queen positions, or None if no solution
+    """
+    board = load_bitboard(regions, queens or [])
+    if board is None:
+        return None
+    started = time.perf_counter() if stats is not None else 0.0
+    solved = board.search()
+    if stats is not None:
+        stats.add(nodes=board.nodes, backtracks=board.backtracks)
+        stats.add_phase('search', time.perf_counter() - started)
+    return board.solution() if solved else None
+
+
+def solve_queens_steps(regions, queens=None, every=1000, node_limit=None, time_limit=None,
+                       engine='bitmask', stats=None):
+    """
+    Stepping form of the complete solvers for callers that must stay responsive.
+
+    The search hands control back every `every` placements, so a caller
+    (e.g. the browser page) can update a progress display between steps,
+    stop early by closing the generator, or cap the work with a node or
+    time budget.
+
+    Args:
+        regions: 2D list representing colored regions
+        queens: Optional list of queens that must be part of the solution
+        every: Placements between progress reports
+        node_limit: Stop with status 'node_limit' after about this many placements
+        time_limit: Stop with status 'timeout' after about this many seconds
+        engine: 'bitmask', 'csp' or 'dlx' (local search cannot be stepped)
+        stats: Optional SolverStats; receives the engine's 'nodes' and
+               'backtracks' once the search ends or is closed
+
+    Yields:
+        dict: Progress reports, then a final report whose 'result' is the
+              solution (list of queen positions) or None; see
+              solver_stats.stepped()
+    """
+    if engine not in ('bitmask', 'csp', 'dlx'):
+        raise ValueError(f"Queens engine {engine!r} cannot be stepped")
+
+    def search():
+        if engine == 'bitmask':
+            solver = load_bitboard(regions, queens or [])
+            if solver is None:
+                return None
+            ready = True
+        elif engine == 'csp':
+            solver = QueensDomains(regions)
+            ready = (solver.num_regions == solver.n
+                     and all(solver.assign(q['row'], q['col']) for q in queens or [])
+                     and solver.propagate())
+        else:
+            solver = QueensDLX(regions)
+            ready = (solver.num_regions == solver.n
+                     and all(solver.select(q['row'], q['col']) for q in queens or []))
+        if not ready:
+            return None
+        try:
+            for cells in solver.solutions(every):
+                if cells is None:
+                    yield
+                elif engine == 'bitmask':
+                    return solver.solution()
+                else:
+                    return [{'row': cell // solver.n, 'col': cell % solver.n} for cell in sorted(cells)]
+            return None
+        finally:
+            if stats is not None:
+                stats.add(nodes=solver.nodes, backtracks=solver.backtracks)
+
+    return stepped(search(), every, node_limit, time_limit)
+
+
+class QueensDLX:
+    """
+    Exact-cover encoding of the Queens puzzle solved with Algorithm X
+    and Dancing Links.
+
+    Every cell is one matrix row covering its board row, column and region
+    (primary columns, each covered exactly once) and the 2x2 windows that
+    contain it (secondary columns, covered at most once). Two touching
+    cells always share a window, so the windows encode adjacency.
+
+    The links live in flat integer lists; node 0 is the root and nodes
+    1..num_columns are the column headers.
+    """
+
+    def __init__(self, regions):
+        masks = QueensMasks(regions)
+        n = masks.n
+        self.n = n
+        self.num_regions = masks.num_regions
+        num_primary = 2 * n + masks.num_regions
+        num_windows = max(n - 1, 0) ** 2
+        num_columns = num_primary + num_windows
+
+        L = list(range(-1, num_columns))
+        R = list(range(1, num_columns + 2))
+        L[0] = num_primary
+        R[num_primary] = 0
+        # Secondary headers are self-linked so they are never chosen
+        for col in range(num_primary + 1, num_columns + 1):
+            L[col] = R[col] = col
+        U = list(range(num_columns + 1))
+        D = list(range(num_columns + 1))
+        C = list(range(num_columns + 1))
+        self.sizes = [0] * (num_columns + 1)
+        self.cell_of = [-1] * (num_columns + 1)
+        self.first_node = []
+
+        for cell in range(n * n):
+            r, c = divmod(cell, n)
+            cols = [1 + r, 1 + n + c, 1 + 2 * n + masks.cell_region[cell]]
+            for wr in (r - 1, r):
+                for wc in (c - 1, c):
+                    if 0 <= wr < n - 1 and 0 <= wc < n - 1:
+                        cols.append(1 + num_primary + wr * (n - 1) + wc)
+            first = len(C)
+            self.first_node.append(first)
+            for offset, col in enumerate(cols):
+                node = first + offset
+                L.append(first + (offset - 1) % len(cols))
+                R.append(first + (offset + 1) % len(cols))
+                U.append(U[col])
+                D.append(col)
+                D[U[col]] = node
+                U[col] = node
+                C.append(col)
+                self.cell_of.append(cell)
+                self.sizes[col] += 1
+
+        self.L, self.R, self.U, self.D, self.C = L, R, U, D, C
+        self.partial = []
+        self.nodes = self.backtracks = 0  # Rows selected and undone by solutions()
+
+    def cover(self, col):
+        L, R, U, D, C, sizes = self.L, self.R, self.U, self.D, self.C, self.sizes
+        L[R[col]] = L[col]
+        R[L[col]] = R[col]
+        i = D[col]
+        while i != col:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                sizes[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, col):
+        L, R, U, D, C, sizes = self.L, self.R, self.U, self.D, self.C, self.sizes
+        i = U[col]
+        while i != col:
+            j = L[i]
+            while j != i:
+                sizes[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[col]] = col
+        R[L[col]] = col
+
+    def select(self, row, col):
+        """
+        Fix a queen before searching by covering every column of its cell.
+
+        Returns:
+            bool: False if the cell conflicts with a queen already selected
+        """
+        # A queen sharing any column with this cell has unlinked the
+        # cell's nodes from its other columns
+        node = self.first_node[row * self.n + col]
+        j = node
+        while True:
+            if self.D[self.U[j]] != j:
+                return False
+            j = self.R[j]
+            if j == node:
+                break
+        j = node
+        while True:
+            self.cover(self.C[j])
+            j = self.R[j]
+            if j == node:
+                break
+        self.partial.append(row * self.n + col)
+        return True
+
+    def solutions(self, every=None):
+        """
+        Enumerate every completion of the selected queens.
+
+        Args:
+            every: If set, also yield None after every `every` rows selected
+                   so a caller can pause or cancel the search
+
+        Yields:
+            list: Sorted cell indices (row * n + col) of each solution
+        """
+        R, D, C, sizes = self.R, self.D, self.C, self.sizes
+        if R[0] == 0:
+            yield sorted(self.partial)
+            return
+
+        # Choose the primary column with the fewest rows (Knuth's S heuristic)
+        best = R[0]
+        best_size = sizes[best]
+        col = R[best]
+        while col != 0 and best_size > 0:
+            if sizes[col] < best_size:
+                best, best_size = col, sizes[col]
+            col = R[col]
+        if best_size == 0:
+            return
+
+        self.cover(best)
+        i = D[best]
+        while i != best:
+            self.partial.append(self.cell_of[i])
+            self.nodes += 1
+            if every and not self.nodes % every:
+                yield None
+            j = R[i]
+            while j != i:
+                self.cover(C[j])
+                j = R[j]
+            yield from self.solutions(every)
+            j = self.L[i]
+            while j != i:
+                self.uncover(C[j])
+                j = self.L[j]
+            self.partial.pop()
+            self.backtracks += 1
+            i = D[i]
+        self.uncover(best)
+
+
+def enumerate_solutions_dlx(regions, queens=None, limit=None, stats=None):
+    """
+    Enumerate Queens solutions with Dancing Links.
+
+    Args:
+        regions: 2D list representing colored regions
+        queens: Optional list of queens that must be part of every solution
+        limit: Stop after this many solutions (None for all)
+        stats: Optional SolverStats; receives 'nodes' (rows selected) and
+               'backtracks' once the enumeration ends or is closed
+
+    Yields:
+        list: Each solution as a list of queen positions sorted by row
+    """
+    dlx = QueensDLX(regions)
+    n = dlx.n
+    if dlx.num_regions != n:
+        return
+    for q in queens or []:
+        if not dlx.select(q['row'], q['col']):
+            return
+    found = 0
+    try:
+        for cells in dlx.solutions():
+            yield [{'row': cell // n, 'col': cell % n} for cell in cells]
+            found += 1
+            if limit is not None and found >= limit:
+                return
+    finally:
+        if stats is not None:
+            stats.add(nodes=dlx.nodes, backtracks=dlx.backtracks)
+
+
+def solve_queens_dlx(regions, queens=None, stats=None):
+    """
+    Solve Queens puzzle as exact cover with Algorithm X / Dancing Links.
+
+    Args:
+        regions: 2D list representing colored regions
+        queens: Optional list of queens that must be part of the solution
+        stats: Optional SolverStats; receives 'nodes', 'backtracks' and the
+               'search' phase time
+
+    Returns:
+        list: Solution as list of queen positions, or None if no solution
+    """
+    started = time.perf_counter() if stats is not None else 0.0
+    solutions = enumerate_solutions_dlx(regions, queens, limit=1, stats=stats)
+    solution = next(solutions, None)
+    solutions.close()
+    if stats is not None:
+        stats.add_phase('search', time.perf_counter() - started)
+    return solution
+
+
+def solve_queens_local_search(regions, max_iterations=200000, time_limit=None,
+                              max_restarts=None, tabu_tenure=None, rng=None):
+    """
+    Solve Queens puzzle with min-conflicts local search (tabu + random restarts).
+
+    Meant for very large boards (N = 30-100) where exhaustive search is
+    hopeless. Queens are kept one per row with the columns forming a
+    permutation, so row and column constraints always hold and the score
+    counts what is left: pairs of queens sharing a region plus touching
+    queens in consecutive rows. A move swaps the columns of a conflicted
+    row and any other row; its score change is computed from the (at most
+    four) regions and row pairs it touches. Swaps that would undo a recent
+    move are tabu unless they reach a new best score.
+
+    Args:
+        regions: 2D list representing colored regions
+        max_iterations: Total move budget over all restarts
+        time_limit: Optional wall-clock budget in seconds
+        max_restarts: Optional cap on restarts (default: until budgets run out)
+        tabu_tenure: Moves a swapped-out column stays tabu for its row
+                     (default: n // 4 + 2)
+        rng: Optional random.Random instance for reproducible runs
+
+    Returns:
+        list: Solution as list of queen positions (checked with
+              validate_solution), or None if the budgets run out
+    """
+    masks = QueensMasks(regions)
+    n = masks.n
+    if masks.num_regions != n or n == 0:
+        return None
+    rng = rng or random.Random()
+    if tabu_tenure is None:
+        tabu_tenure = n // 4 + 2
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    cell_region = masks.cell_region
+    stall_limit = 20 * n
+
+    iterations = 0
+    restarts = 0
+    while iterations < max_iterations and (max_restarts is None or restarts <= max_restarts):
+        restarts += 1
+        cols = list(range(n))
+        rng.shuffle(cols)
+        region_count = [0] * n
+        for r in range(n):
+            region_count[cell_region[r * n + cols[r]]] += 1
+
+        def touching(a, b):
+            return 0 <= a and b < n and abs(cols[a] - cols[b]) <= 1
+
+        cost = sum(count * (count - 1) // 2 for count in region_count)
+        cost += sum(1 for r in range(n - 1) if touching(r, r + 1))
+        best_cost = cost
+        stall = 0
+        tabu = {}
+
+        while iterations < max_iterations and stall < stall_limit:
+            if cost == 0:
+                solution = [{'row': r, 'col': cols[r]} for r in range(n)]
+                if validate_solution(solution, regions):
+                    return solution
+                break
+            if deadline is not None and iterations % 64 == 0 and time.monotonic() > deadline:
+                return None
+            iterations += 1
+
+            conflicted = [r for r in range(n)
+                          if region_count[cell_region[r * n + cols[r]]] > 1
+                          or touching(r - 1, r) or touching(r, r + 1)]
+            i = rng.choice(conflicted)
+            ci = cols[i]
+
+            best_moves = []
+            best_delta = None
+            for j in range(n):
+                if j == i:
+                    continue
+                cj = cols[j]
+                # Region change: remove both old cells, add both new ones
+                ki_old, kj_old = cell_region[i * n + ci], cell_region[j * n + cj]
+                ki_new, kj_new = cell_region[i * n + cj], cell_region[j * n + ci]
+                delta = 0
+                changes = {}
+                for k, step in ((ki_old, -1), (kj_old, -1), (ki_new, 1), (kj_new, 1)):
+                    changes[k] = changes.get(k, 0) + step
+                for k, step in changes.items():
+                    if step:
+                        before = region_count[k]
+                        after = before + step
+                        delta += after * (after - 1) // 2 - before * (before - 1) // 2
+                # Adjacency change on the row pairs around i and j
+                pairs = {(i - 1, i), (i, i + 1), (j - 1, j), (j, j + 1)}
+                before = sum(1 for a, b in pairs if touching(a, b))
+                cols[i], cols[j] = cj, ci
+                after = sum(1 for a, b in pairs if touching(a, b))
+                cols[i], cols[j] = ci, cj
+                delta += after - before
+
+                is_tabu = tabu.get((i, cj), 0) > iterations or tabu.get((j, ci), 0) > iterations
+                if is_tabu and cost + delta >= best_cost:
+                    continue
+                if best_delta is None or delta < best_delta:
+                    best_delta, best_moves = delta, [j]
+                elif delta == best_delta:
+                    best_moves.append(j)
+
+            if not best_moves:
+                stall += 1
+                continue
+            j = rng.choice(best_moves)
+            cj = cols[j]
+            region_count[cell_region[i * n + ci]] -= 1
+            region_count[cell_region[j * n + cj]] -= 1
+            region_count[cell_region[i * n + cj]] += 1
+            region_count[cell_region[j * n + ci]] += 1
+            cols[i], cols[j] = cj, ci
+            tabu[(i, ci)] = iterations + tabu_tenure
+            tabu[(j, cj)] = iterations + tabu_tenure
+            cost += best_delta
+            if cost < best_cost:
+                best_cost = cost
+                stall = 0
+            else:
+                stall += 1
+
     return None
 
 
-def solve_queens(regions, queens=None, row=0):
+# Engines selectable through solve_queens(..., engine=name)
+QUEENS_ENGINES = {
+    'bitmask': solve_queens_bitmask,
+    'csp': solve_queens_csp,
+    'dlx': solve_queens_dlx,
+    'local': solve_queens_local_search,
+}
+
+
+def solve_queens(regions, queens=None, row=0, engine='bitmask', stats=None):
     """
-    Main entry point for solving - uses advanced CSP algorithm.
+    Main entry point for solving - uses the bitmask CSP engine by default.
     
     Args:
         regions: 2D list representing colored regions
         queens: Current list of placed queens (ignored, kept for API compatibility)
         row: Current row (ignored, kept for API compatibility)
+        engine: Name of the engine in QUEENS_ENGINES ('bitmask', 'csp', 'dlx'
+                or 'local'; local search may return None on solvable boards)
+        stats: Optional SolverStats; the bitmask, csp and dlx engines fill
+               in their counters, local search records its time as the
+               'search' phase
     
     Returns:
         list: Solution as list of queen positions, or None if no solution
     """
-    return solve_queens_csp(regions)
+    if engine not in QUEENS_ENGINES:
+        raise ValueError(f"Unknown Queens engine: {engine!r}")
+    if stats is None:
+        return QUEENS_ENGINES[engine](regions)
+    if engine != 'local':
+        return QUEENS_ENGINES[engine](regions, stats=stats)
+    with stats.phase('search'):
+        return QUEENS_ENGINES[engine](regions)
 
 
-def get_hint(regions, queens):
+def get_hint(regions, queens, time_limit=None):
     """
     Get a hint for the next valid queen placement using intelligent search.
-    Uses MRV heuristic to suggest the most constrained row first.
+    Picks the most constrained row (MRV) and suggests the column that the
+    solution extending the player's queens uses there.
     
     Args:
         regions: 2D list representing colored regions
         queens: Current list of placed queens
+        time_limit: Optional seconds for the search; TimeoutError is raised
+                    once they pass without an answer
     
     Returns:
         dict: Next valid position as {'row': r, 'col': c}, or None if no hint
     """
-    board_size = len(regions)
-    assigned_rows = set(q['row'] for q in queens)
-    
-    # If no queens placed yet, start with MRV
-    if len(queens) == 0:
-        row = select_unassigned_variable_mrv(queens, regions, board_size)
-        if row is not None:
-            valid_cols = get_row_domains(row, queens, regions, board_size)
-            if valid_cols:
-                return {'row': row, 'col': valid_cols[0]}
-    
-    # Use MRV to find best row to place next queen
-    best_row = select_unassigned_variable_mrv(queens, regions, board_size)
-    
-    if best_row is not None:
-        # Get valid columns for this row
-        valid_cols = get_row_domains(best_row, queens, regions, board_size)
-        
-        # Return first valid placement that passes forward checking
-        for col in valid_cols:
-            if forward_check(best_row, col, queens, regions, board_size):
-                return {'row': best_row, 'col': col}
-        
-        # If forward checking failed, return first valid placement
-        if valid_cols:
-            return {'row': best_row, 'col': valid_cols[0]}
-    
-    # Fallback: find any valid placement
-    for row in range(board_size):
-        if row in assigned_rows:
+    board = load_bitboard(regions, queens)
+    if board is None:
+        return None
+    n = board.n
+
+    # MRV: row with the fewest remaining columns
+    best_row = None
+    best_count = n + 1
+    for row in range(n):
+        if (board.rows >> row) & 1:
             continue
-        for col in range(board_size):
-            if get_domain(row, col, queens, regions, board_size):
-                return {'row': row, 'col': col}
-    
-    return None
+        count = board.row_candidates(row).bit_count()
+        if count < best_count:
+            best_row, best_count = row, count
+    if best_row is None or best_count == 0:
+        return None
+
+    # Fallback when the player's queens cannot be completed: any legal cell in that row
+    cols = board.row_candidates(best_row)
+    fallback = {'row': best_row, 'col': (cols & -cols).bit_length() - 1}
+
+    if time_limit is None:
+        solved = board.search()
+    else:
+        deadline = time.monotonic() + time_limit
+        solved = False
+        for placed in board.solutions(every=1000):
+            if placed is not None:
+                solved = True
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError("Queens hint search timed out")
+    if not solved:
+        return fallback
+    for cell in board.queens:
+        if cell // n == best_row:
+            return {'row': best_row, 'col': cell % n}
+    return fallback
+
+
+class QueensSession:
+    """
+    Stateful hint engine for one board, created once and fed the player's moves.
+
+    Keeps a propagated QueensDomains for the player's queens (one trail mark
+    per queen) and a cached full solution. A hint costs O(n) while the
+    player's queens agree with the cached solution; otherwise one search
+    runs from the already-propagated state and refreshes the cache.
+    """
+
+    def __init__(self, regions):
+        self.regions = [list(row) for row in regions]
+        self.domains = QueensDomains(regions)
+        self.n = self.domains.n
+        self.placed = []   # Player cells in placement order
+        self.marks = []    # Trail mark taken before each player cell
+        self.dead_at = None  # Index of the first queen no solution agrees with
+        self.solution = None  # Cached solution as a set of cells
+        if self.domains.num_regions == self.n and self.domains.propagate():
+            self.refresh_solution()
+        else:
+            self.dead_at = 0
+
+    def refresh_solution(self):
+        """
+        Search from the current state and cache the first solution found.
+
+        The search's placements are undone afterwards, so the domains keep
+        only the player's queens and what propagation forced.
+        """
+        mark = self.domains.mark()
+        search = self.domains.solutions()
+        try:
+            for cells in search:
+                self.solution = set(cells)
+                return True
+            return False
+        finally:
+            search.close()
+            self.domains.undo_to(mark)
+
+    def apply(self, cell):
+        """Record a player cell and, while the state is consistent, propagate it."""
+        self.marks.append(self.domains.mark())
+        self.placed.append(cell)
+        if self.dead_at is not None or cell in self.domains.queens:
+            return
+        if not (self.domains.assign(cell // self.n, cell % self.n) and self.domains.propagate()):
+            self.dead_at = len(self.placed) - 1
+
+    def place(self, row, col):
+        """Player placed a queen at (row, col)."""
+        self.apply(row * self.n + col)
+
+    def remove(self, row, col):
+        """
+        Player removed the queen at (row, col).
+
+        Rewinds the trail to that queen's mark and replays the queens placed
+        after it, so removing the latest queen is a plain undo.
+        """
+        cell = row * self.n + col
+        if cell not in self.placed:
+            return
+        index = self.placed.index(cell)
+        replay = self.placed[index + 1:]
+        self.domains.undo_to(self.marks[index])
+        del self.placed[index:]
+        del self.marks[index:]
+        if self.dead_at is not None and self.dead_at >= index:
+            self.dead_at = None
+        for other in replay:
+            self.apply(other)
+
+    def sync(self, queens):
+        """Bring the session in line with a full list of {'row', 'col'} queens."""
+        wanted = [q['row'] * self.n + q['col'] for q in queens]
+        wanted_set = set(wanted)
+        for cell in [cell for cell in self.placed if cell not in wanted_set]:
+            self.remove(cell // self.n, cell % self.n)
+        placed = set(self.placed)
+        for cell in wanted:
+            if cell not in placed:
+                self.apply(cell)
+
+    def hint(self):
+        """
+        Suggest the next queen.
+
+        Prefers a queen that propagation has already forced, then the cached
+        solution's queen in the most constrained open row.
+
+        Returns:
+            dict: Next position as {'row': r, 'col': c}, or None if no hint
+        """
+        if self.dead_at is not None:
+            if self.dead_at == 0 and not self.placed:
+                return None
+            return get_hint(self.regions, [{'row': cell // self.n, 'col': cell % self.n}
+                                           for cell in self.placed])
+
+        placed = set(self.placed)
+        if self.solution is None or not placed <= self.solution \
+                or not set(self.domains.queens) <= self.solution:
+            if not self.refresh_solution():
+                self.solution = None
+                return get_hint(self.regions, [{'row': cell // self.n, 'col': cell % self.n}
+                                               for cell in self.placed])
+
+        n = self.n
+        for cell in self.domains.queens:
+            if cell not in placed:
+                return {'row': cell // n, 'col': cell % n}
+
+        best = None
+        best_count = n + 1
+        for cell in self.solution:
+            row = cell // n
+            count = self.domains.row_cands[row].bit_count()
+            if cell not in placed and count < best_count:
+                best, best_count = cell, count
+        if best is None:
+            return None
+        return {'row': best // n, 'col': best % n}
 
 
 def validate_solution(queens, regions):
@@ -298,4 +1558,230 @@ def validate_solution(queens, regions):
             if abs(queen['row'] - other['row']) <= 1 and abs(queen['col'] - other['col']) <= 1:
                 return False
     
-    return True
\ No newline at end of file
+    return True
+
+
+def plant_queens(size, rng):
+    """
+    Draw a random valid queen placement ignoring regions (one per row and
+    column, no two touching).
+
+    Returns:
+        list: Column of the queen in each row
+    """
+    cols = []
+    used = set()
+
+    def place(row):
+        if row == size:
+            return True
+        options = [c for c in range(size) if c not in used
+                   and (row == 0 or abs(c - cols[-1]) > 1)]
+        rng.shuffle(options)
+        for c in options:
+            cols.append(c)
+            used.add(c)
+            if place(row + 1):
+                return True
+            cols.pop()
+            used.discard(c)
+        return False
+
+    return cols if place(0) else None
+
+
+def rival_through(board, cell):
+    """
+    Look for a solution of board that puts a queen on cell.
+
+    The board is left as it was found (no queens placed).
+
+    Returns:
+        list: Cell indices of such a solution, or None if there is none
+    """
+    if not (board.free >> cell) & 1:
+        return None
+    board.place_cell(cell)
+    rival = None
+    for cells in board.solutions():
+        rival = list(cells)
+        break
+    while board.queens:
+        board.undo()
+    return rival
+
+
+def region_stays_connected(regions, cell):
+    """Check that the region of `cell` is still 4-connected without it."""
+    size = len(regions)
+    label = regions[cell // size][cell % size]
+    remaining = {r * size + c for r in range(size) for c in range(size)
+                 if regions[r][c] == label} - {cell}
+    if not remaining:
+        return False
+    stack = [remaining.pop()]
+    while stack:
+        r, c = divmod(stack.pop(), size)
+        for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+            if 0 <= nr < size and 0 <= nc < size and nr * size + nc in remaining:
+                remaining.discard(nr * size + nc)
+                stack.append(nr * size + nc)
+    return not remaining
+
+
+def neighbour_labels(regions, cell):
+    """Distinct region labels orthogonally adjacent to a cell (holes excluded)."""
+    size = len(regions)
+    r, c = divmod(cell, size)
+    labels = {regions[nr][nc] for nr, nc in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1))
+              if 0 <= nr < size and 0 <= nc < size}
+    labels.discard(None)
+    return sorted(labels)
+
+
+def generate_random_regions(size, rng=None, max_attempts=50, grow_probability=0.5,
+                            max_repairs=None, unique=True):
+    """
+    Generate a region layout with exactly one solution.
+
+    Plants a random queen placement and seeds one region on each queen;
+    every other cell starts as a hole (label None).
+
+    1. Growth: regions grow in random layers and each layer is certified
+       before the next. A layout only gains solutions as cells join
+       regions, so any rival to the planted solution puts a queen on a cell
+       of the newest layer; one such cell goes back to being a hole and
+       never joins that region again. The search for rivals is therefore
+       only run through the new cells (rival_through), on one board per
+       layer.
+    2. Repair: growth can get stuck on holes that every neighbouring region
+       would turn into a rival's queen. Those holes are filled anyway and
+       each remaining rival is broken by handing one of its non-planted
+       queen cells to a neighbouring region (keeping regions connected).
+
+    The finished board is confirmed with count_solutions().
+
+    Args:
+        size: Board size N (regions are labelled 0..N-1)
+        rng: Optional random.Random instance for reproducible output
+        max_attempts: Planted placements to try before giving up
+        grow_probability: Chance that a hole touching a region joins it in
+                          a given layer (lower gives more irregular shapes)
+        max_repairs: Rival-breaking moves allowed per attempt
+                     (defaults to 4 * size)
+        unique: With False, skip certification and return the first grown
+                layout; it is solvable (the planted queens) but may have
+                several solutions. Used for large stress boards (N = 30-100).
+
+    Returns:
+        list: 2D list of region labels, or None if no board was found
+    """
+    rng = rng or random.Random()
+    if max_repairs is None:
+        max_repairs = 4 * size
+
+    for _ in range(max_attempts):
+        cols = plant_queens(size, rng)
+        if cols is None:
+            return None
+        planted = {r * size + c for r, c in enumerate(cols)}
+
+        # Shuffle labels so the region id does not give away the queen's row
+        labels = list(range(size))
+        rng.shuffle(labels)
+        regions = [[None] * size for _ in range(size)]
+        for r, c in enumerate(cols):
+            regions[r][c] = labels[r]
+
+        # 1. Certified growth
+        rejected = set()
+        holes = set(range(size * size)) - planted
+        while holes:
+            layer = {}
+            stuck = True
+            for cell in holes:
+                options = [label for label in neighbour_labels(regions, cell)
+                           if (cell, label) not in rejected]
+                if options:
+                    stuck = False
+                    if rng.random() < grow_probability:
+                        layer[cell] = rng.choice(options)
+            if stuck:
+                break
+            for cell, label in layer.items():
+                regions[cell // size][cell % size] = label
+            if unique:
+                # Rivals are split by their first layer cell in a fixed
+                # order: once every rival through a cell is broken, that
+                # cell is dropped from the search for the rest of the layer.
+                # Rejecting cells only removes solutions, so one board
+                # serves the whole layer.
+                board = QueensBitboard(regions)
+                for cell in list(layer):
+                    while cell in layer:
+                        rival = rival_through(board, cell)
+                        if rival is None:
+                            break
+                        victim = rng.choice([other for other in rival if other in layer])
+                        rejected.add((victim, layer.pop(victim)))
+                        regions[victim // size][victim % size] = None
+                        board.free &= ~(1 << victim)
+                    board.free &= ~(1 << cell)
+            holes.difference_update(layer)
+
+        # 2. Fill stuck holes, then break rivals one at a time
+        filled = []
+        while holes:
+            for cell in list(holes):
+                options = neighbour_labels(regions, cell)
+                if options:
+                    regions[cell // size][cell % size] = rng.choice(options)
+                    holes.discard(cell)
+                    filled.append(cell)
+        if not unique:
+            return regions
+        # Every rival goes through a filled cell, and moving a cell to another
+        # region only adds rivals through that cell. Cells are settled from
+        # a stack: a moved cell goes on top and is searched on a fresh board
+        # (no exclusions), and settled cells are excluded again once no
+        # moved cell is left unsettled.
+        pending = filled
+        settled = set()
+        unsettled_moves = 0
+        repairs = 0
+        rival = None
+        board = QueensBitboard(regions)
+        while pending:
+            cell = pending[-1]
+            rival = rival_through(board, cell)
+            if rival is None:
+                pending.pop()
+                settled.add(cell)
+                board.free &= ~(1 << cell)
+                if unsettled_moves:
+                    unsettled_moves -= 1
+                    if not unsettled_moves:
+                        for done in settled:
+                            board.free &= ~(1 << done)
+                continue
+            if repairs == max_repairs:
+                break
+            repairs += 1
+            moves = [(other, label) for other in rival if other not in planted
+                     for label in neighbour_labels(regions, other)
+                     if label != regions[other // size][other % size]]
+            rng.shuffle(moves)
+            for other, label in moves:
+                if region_stays_connected(regions, other):
+                    regions[other // size][other % size] = label
+                    break
+            else:
+                break
+            pending.append(other)
+            unsettled_moves += 1
+            board = QueensBitboard(regions)
+
+        if rival is None and count_solutions(regions) == 1:
+            return regions
+
+    return None
@@ -0,0 +1,234 @@
+"""
+Persistent, symmetry-aware solution cache for the Queens, Zip and Tango solvers.
+
+Puzzles that differ only by a rotation or reflection of the board (and, for
+Queens, by how the regions are numbered; for Tango, by swapping suns and
+moons) share one canonical form. The cache stores solutions in canonical
+coordinates in SQLite, keyed by a hash of that form, and maps a hit back
+into the caller's orientation, so a repeated daily puzzle is answered
+without any search. The table is bounded: once it holds more than
+max_entries rows the least recently used ones are evicted.
+
+    cache = SolutionCache('solutions.sqlite3')
+    solution = cache.solve('queens', regions)        # solves on a miss
+    solution = cache.solve('zip', grid)
+    solution = cache.solve('tango', (grid, equals, opps))
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+import queens_solver
+import tango_solver
+import zip_solver
+
+
+# ---- Board symmetries ----
+# Transform t in 0..7 maps cell (r, c) of an H x W board; t >= 4 transposes
+# the board, so the result is W x H.
+
+def transform_cell(t, r, c, H, W):
+    if t >= 4:
+        r, c, H, W = c, r, W, H
+    if t & 1:
+        c = W - 1 - c
+    if t & 2:
+        r = H - 1 - r
+    return r, c
+
+
+def transform_shape(t, H, W):
+    return (W, H) if t >= 4 else (H, W)
+
+
+def transform_grid(t, grid):
+    H, W = len(grid), len(grid[0])
+    h, w = transform_shape(t, H, W)
+    out = [[None] * w for _ in range(h)]
+    for r in range(H):
+        for c in range(W):
+            nr, nc = transform_cell(t, r, c, H, W)
+            out[nr][nc] = grid[r][c]
+    return out
+
+
+def inverse_cells(t, H, W):
+    """Map from transformed cell back to the original cell."""
+    return {transform_cell(t, r, c, H, W): (r, c) for r in range(H) for c in range(W)}
+
+
+def relabel(grid):
+    """Renumber labels by order of first appearance (row-major); None stays None."""
+    labels = {}
+    return [[None if v is None else labels.setdefault(v, len(labels)) for v in row] for row in grid]
+
+
+# ---- Per-game canonical forms ----
+# canonical(puzzle) -> (form, variant): form is JSON-serializable and equal
+# for all symmetric puzzles; variant identifies the caller's orientation.
+# to_canonical / from_canonical move a solution between the two.
+
+def queens_canonical(regions):
+    H, W = len(regions), len(regions[0])
+    best = None
+    for t in range(8):
+        form = relabel(transform_grid(t, regions))
+        text = json.dumps(form)
+        if best is None or text < best[0]:
+            best = (text, form, (t, H, W))
+    return best[1], best[2]
+
+
+def queens_to_canonical(solution, variant):
+    t, H, W = variant
+    return sorted(transform_cell(t, q['row'], q['col'], H, W) for q in solution)
+
+
+def queens_from_canonical(stored, variant):
+    t, H, W = variant
+    back = inverse_cells(t, H, W)
+    cells = sorted(back[tuple(cell)] for cell in stored)
+    return [{'row': r, 'col': c} for r, c in cells]
+
+
+def zip_canonical(grid):
+    H, W = len(grid), len(grid[0])
+    best = None
+    for t in range(8):
+        form = transform_grid(t, grid)
+        text = json.dumps(form)
+        if best is None or text < best[0]:
+            best = (text, form, (t, H, W))
+    return best[1], best[2]
+
+
+def zip_to_canonical(solution, variant):
+    t, H, W = variant
+    return [transform_cell(t, *solution[num], H, W) for num in sorted(solution)]
+
+
+def zip_from_canonical(stored, variant):
+    t, H, W = variant
+    back = inverse_cells(t, H, W)
+    return {num: back[tuple(cell)] for num, cell in enumerate(stored, 1)}
+
+
+def tango_canonical(puzzle):
+    grid, equals, opps = puzzle
+    n = len(grid)
+    best = None
+    for t in range(8):
+        cells = transform_grid(t, [[v if v in (0, 1) else None for v in row] for row in grid])
+        pairs = []
+        for kind, group in ((0, equals), (1, opps)):
+            for r1, c1, r2, c2 in group:
+                a, b = sorted((transform_cell(t, r1, c1, n, n), transform_cell(t, r2, c2, n, n)))
+                pairs.append((kind, *a, *b))
+        pairs.sort()
+        for swap in (0, 1):
+            form = [[None if v is None else v ^ swap for v in row] for row in cells], pairs
+            text = json.dumps(form)
+            if best is None or text < best[0]:
+                best = (text, form, (t, swap, n))
+    return best[1], best[2]
+
+
+def tango_to_canonical(solution, variant):
+    t, swap, n = variant
+    return [[v ^ swap for v in row] for row in transform_grid(t, solution)]
+
+
+def tango_from_canonical(stored, variant):
+    t, swap, n = variant
+    back = inverse_cells(t, n, n)
+    out = [[None] * n for _ in range(n)]
+    for (r, c), (orig_r, orig_c) in back.items():
+        out[orig_r][orig_c] = stored[r][c] ^ swap
+    return out
+
+
+GAMES = {
+    'queens': (queens_canonical, queens_to_canonical, queens_from_canonical,
+               lambda regions: queens_solver.solve_queens(regions)),
+    'zip': (zip_canonical, zip_to_canonical, zip_from_canonical,
+            lambda grid: zip_solver.solve_zip(grid)),
+    'tango': (tango_canonical, tango_to_canonical, tango_from_canonical,
+              lambda puzzle: tango_solver.solve_grid(*puzzle)),
+}
+
+MISS = object()
+
+
+class SolutionCache:
+    """
+    SQLite-backed LRU cache of solutions in canonical orientation.
+
+    Unsolvable puzzles are cached too (as None).
+
+    Args:
+        path: SQLite database file (':memory:' for a throwaway cache)
+        max_entries: Rows kept before the least recently used are evicted
+    """
+
+    def __init__(self, path='solutions.sqlite3', max_entries=100000):
+        self.max_entries = max_entries
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS solutions ('
+                        'key TEXT PRIMARY KEY, game TEXT, solution TEXT, used INTEGER)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)')
+        self.db.commit()
+        self.hits = self.misses = 0
+
+    def key(self, game, puzzle):
+        """(cache key, variant) of a puzzle"""
+        form, variant = GAMES[game][0](puzzle)
+        text = game + ':' + json.dumps(form, separators=(',', ':'))
+        return hashlib.sha256(text.encode()).hexdigest(), variant
+
+    def get(self, game, puzzle):
+        """Cached solution in the caller's orientation, None if unsolvable, MISS if unknown."""
+        key, variant = self.key(game, puzzle)
+        row = self.db.execute('SELECT solution FROM solutions WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return MISS
+        self.hits += 1
+        self.db.execute('UPDATE solutions SET used = ? WHERE key = ?', (time.time_ns(), key))
+        self.db.commit()
+        stored = json.loads(row[0])
+        return None if stored is None else GAMES[game][2](stored, variant)
+
+    def put(self, game, puzzle, solution):
+        key, variant = self.key(game, puzzle)
+        stored = None if solution is None else GAMES[game][1](solution, variant)
+        self.db.execute('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?)',
+                        (key, game, json.dumps(stored), time.time_ns()))
+        excess = self.db.execute('SELECT COUNT(*) FROM solutions').fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.db.execute('DELETE FROM solutions WHERE key IN '
+                            '(SELECT key FROM solutions ORDER BY used LIMIT ?)', (excess,))
+        self.db.commit()
+
+    def solve(self, game, puzzle, solver=None):
+        """
+        Cached solve: a hit is mapped back without search, a miss is solved and stored.
+
+        Args:
+            game: 'queens', 'zip' or 'tango'
+            puzzle: regions (queens), grid (zip) or (grid, equals, opps) (tango)
+            solver: Optional callable(puzzle) replacing the game's default solver
+        """
+        solution = self.get(game, puzzle)
+        if solution is MISS:
+            solution = (solver or GAMES[game][3])(puzzle)
+            self.put(game, puzzle, solution)
+        return solution
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    def close(self):
+        self.db.close()
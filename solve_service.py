@@ -0,0 +1,355 @@
+"""
+Local HTTP/JSON solve service for the Queens, Zip and Tango solvers.
+
+One asyncio server fronts a warm process pool, so many browser tabs (or
+scripts) share a handful of already-imported solver processes instead of
+each booting Pyodide. Every route takes a JSON body and answers with
+{"result": ..., "elapsed_ms": ...} or {"error": ...}:
+
+    POST /queens/solve   {"regions": [[...]]}
+    POST /queens/hint    {"regions": [[...]], "queens": [{"row", "col"}, ...]}
+    POST /zip/solve      {"grid": [[...]]}              -> [[r, c], ...] path
+    POST /zip/hint       {"grid": [[...]]}              -> [num, [r, c]]
+    POST /tango/solve    {"grid": [[...]], "equals": [[r1, c1, r2, c2], ...], "opps": [...]}
+    POST /tango/hint     same body as /tango/solve      -> [r, c, v]
+    GET  /stats          service counters
+
+A body may carry "timeout" (seconds, capped by --timeout). Identical
+requests that arrive while the first is still being solved share its
+answer. When --max-pending distinct jobs are already queued or running the
+service answers 503 with Retry-After instead of queueing more work. With
+--cache, solve routes go through a shared SolutionCache file, so repeated
+(or rotated / reflected) puzzles are answered without search. Bodies whose
+fields have the wrong type or shape (or Tango boards over 16x16) are
+answered 400 before any work is queued, and every job (solve or hint)
+stops at its timeout.
+
+    python solve_service.py --port 8765 --workers 4 --cache solutions.sqlite3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import queens_solver
+import tango_solver
+import zip_solver
+from solution_cache import SolutionCache
+
+MAX_BODY = 1 << 20
+# Tango's line tables enumerate 2**n rows before the first stepping report
+MAX_TANGO_SIZE = 16
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+               503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+
+# ---- Worker side (runs in the pool processes) ----
+
+# Per-worker SolutionCache, opened by the pool initializer when --cache is set
+CACHE = None
+
+
+def open_cache(path):
+    global CACHE
+    CACHE = SolutionCache(path)
+
+
+def cached(game, puzzle, solver):
+    return solver(puzzle) if CACHE is None else CACHE.solve(game, puzzle, solver)
+
+
+def run_steps(steps):
+    """Run a stepping solve to its final report; TimeoutError if it ran out of time."""
+    for report in steps:
+        if report['done']:
+            if report['status'] == 'timeout':
+                raise TimeoutError('Solve timed out')
+            return report['result']
+
+
+def solve_queens_job(payload, time_limit):
+    return cached('queens', payload['regions'],
+                  lambda regions: run_steps(queens_solver.solve_queens_steps(regions, time_limit=time_limit)))
+
+
+def hint_queens_job(payload, time_limit):
+    return queens_solver.get_hint(payload['regions'], payload.get('queens', []), time_limit=time_limit)
+
+
+def solve_zip_job(payload, time_limit):
+    solution = cached('zip', payload['grid'], lambda grid: zip_solver.solve_zip(grid, time_limit=time_limit))
+    return None if solution is None else [list(solution[num]) for num in sorted(solution)]
+
+
+def hint_zip_job(payload, time_limit):
+    hint = zip_solver.hint_zip(payload['grid'], time_limit=time_limit)
+    return None if hint is None else [hint[0], list(hint[1])]
+
+
+def solve_tango_job(payload, time_limit):
+    puzzle = (payload['grid'], payload.get('equals', []), payload.get('opps', []))
+    return cached('tango', puzzle,
+                  lambda puzzle: run_steps(tango_solver.solve_grid_steps(*puzzle, time_limit=time_limit)))
+
+
+def hint_tango_job(payload, time_limit):
+    grid, equals, opps = payload['grid'], payload.get('equals', []), payload.get('opps', [])
+    hint = tango_solver.logical_hint(grid, equals, opps, search=False)
+    if hint is None:
+        # Propagation is stuck (or the board is broken or full): search within the time limit
+        empty = [(r, c) for r, row in enumerate(grid) for c, v in enumerate(row) if v not in (0, 1)]
+        solution = run_steps(tango_solver.solve_grid_steps(grid, equals, opps, time_limit=time_limit))
+        if solution is None or not empty:
+            return None
+        r, c = empty[0]
+        hint = (r, c, solution[r][c])
+    return list(hint[:3])
+
+
+JOBS = {
+    '/queens/solve': solve_queens_job,
+    '/queens/hint': hint_queens_job,
+    '/zip/solve': solve_zip_job,
+    '/zip/hint': hint_zip_job,
+    '/tango/solve': solve_tango_job,
+    '/tango/hint': hint_tango_job,
+}
+
+
+def run_job(route, payload, time_limit):
+    """Entry point inside a worker: ('ok', result) or ('timeout', None)."""
+    try:
+        return 'ok', JOBS[route](payload, time_limit)
+    except TimeoutError:  # includes zip_solver.ZipTimeout
+        return 'timeout', None
+
+
+def warm_up():
+    """Solve one small board per game so tables and caches are built before traffic."""
+    queens_solver.solve_queens([[c for c in range(4)] for _ in range(4)])
+    zip_solver.solve_zip([[1, 0], [0, 4]])
+    tango_solver.solve_grid([[None] * 6 for _ in range(6)], [], [])
+    return os.getpid()
+
+
+# ---- Service ----
+
+class BadRequest(Exception):
+    """Raised for malformed HTTP requests or JSON bodies"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def check_grid(payload, name, square, cell_ok, cells):
+    """Raise BadRequest unless payload[name] is a non-empty (square) list of lists of valid cells."""
+    grid = payload.get(name)
+    if (not isinstance(grid, list) or not grid or not all(isinstance(row, list) for row in grid)
+            or not grid[0] or any(len(row) != (len(grid) if square else len(grid[0])) for row in grid)
+            or not all(cell_ok(v, grid) for row in grid for v in row)):
+        shape = 'square' if square else 'rectangular'
+        raise BadRequest(f"'{name}' must be a non-empty {shape} list of lists of {cells}")
+    return grid
+
+
+def check_payload(route, payload):
+    """Validate the fields a route's job reads, so bad input is a 400 rather than a solver crash."""
+    timeout = payload.get('timeout', 1)
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not timeout > 0:
+        raise BadRequest("'timeout' must be a positive number of seconds")
+    game = route.split('/')[1]
+    if game == 'queens':
+        check_grid(payload, 'regions', True, lambda v, grid: is_int(v) or isinstance(v, str),
+                   'region labels (integers or strings)')
+        queens = payload.get('queens', [])
+        if not isinstance(queens, list) or not all(
+                isinstance(q, dict) and is_int(q.get('row')) and is_int(q.get('col')) for q in queens):
+            raise BadRequest("'queens' must be a list of {\"row\": int, \"col\": int}")
+    elif game == 'zip':
+        check_grid(payload, 'grid', False,
+                   lambda v, grid: is_int(v) and 0 <= v <= len(grid) * len(grid[0]),
+                   'numbers from 0 (empty) to the cell count')
+    else:
+        grid = check_grid(payload, 'grid', True, lambda v, grid: v is None or is_int(v) and v in (0, 1),
+                          '0, 1 or null')
+        n = len(grid)
+        if n > MAX_TANGO_SIZE:
+            raise BadRequest(f"Tango boards are at most {MAX_TANGO_SIZE}x{MAX_TANGO_SIZE}")
+        for name in ('equals', 'opps'):
+            pairs = payload.get(name, [])
+            if not isinstance(pairs, list) or not all(
+                    isinstance(pair, list) and len(pair) == 4 and all(is_int(v) and 0 <= v < n for v in pair)
+                    for pair in pairs):
+                raise BadRequest(f"'{name}' must be a list of [r1, c1, r2, c2] cells on the board")
+
+
+class SolveService:
+    """
+    Coalescing, back-pressured front end for a process pool of solvers.
+
+    Args:
+        workers: Number of solver processes
+        max_pending: Distinct jobs allowed in the pool (queued or running)
+                     before new ones are rejected with 503
+        timeout: Default and maximum per-request timeout in seconds
+        cache: Optional SolutionCache database path shared by the workers
+    """
+
+    def __init__(self, workers=None, max_pending=None, timeout=10.0, cache=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.timeout = timeout
+        self.cache = cache
+        self.pool = None
+        self.in_flight = {}
+        self.counters = {'requests': 0, 'solved': 0, 'coalesced': 0, 'rejected': 0,
+                         'timeouts': 0, 'errors': 0}
+
+    async def start(self):
+        """Start the pool and warm every worker."""
+        loop = asyncio.get_running_loop()
+        if self.cache is not None:
+            SolutionCache(self.cache).close()  # create the table once, before the workers open it
+            self.pool = ProcessPoolExecutor(self.workers, initializer=open_cache, initargs=(self.cache,))
+        else:
+            self.pool = ProcessPoolExecutor(self.workers)
+        await asyncio.gather(*(loop.run_in_executor(self.pool, warm_up)
+                               for _ in range(self.workers)))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def submit(self, route, payload):
+        """
+        Solve one request, sharing the job of an identical in-flight request.
+
+        Returns:
+            tuple: (HTTP status, JSON-ready response body)
+        """
+        timeout = min(float(payload.pop('timeout', self.timeout)), self.timeout)
+        key = (route, json.dumps(payload, sort_keys=True))
+        job = self.in_flight.get(key)
+        if job is not None:
+            self.counters['coalesced'] += 1
+        else:
+            if len(self.in_flight) >= self.max_pending:
+                self.counters['rejected'] += 1
+                return 503, {'error': 'Solver pool is saturated, retry later'}
+            loop = asyncio.get_running_loop()
+            job = loop.run_in_executor(self.pool, run_job, route, payload, timeout)
+            self.in_flight[key] = job
+            job.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        try:
+            # shield: one caller timing out must not cancel the job others wait on
+            outcome, result = await asyncio.wait_for(asyncio.shield(job), timeout)
+        except asyncio.TimeoutError:
+            outcome, result = 'timeout', None
+        if outcome == 'timeout':
+            self.counters['timeouts'] += 1
+            return 504, {'error': f"No answer within {timeout:g}s"}
+        self.counters['solved'] += 1
+        return 200, {'result': result}
+
+    async def handle(self, reader, writer):
+        start = time.perf_counter()
+        try:
+            status, body = await self.dispatch(reader)
+        except BadRequest as error:
+            status, body = error.status, {'error': str(error)}
+        except Exception as error:  # a solver crash must not take the server down
+            self.counters['errors'] += 1
+            status, body = 500, {'error': f"{type(error).__name__}: {error}"}
+        body['elapsed_ms'] = round((time.perf_counter() - start) * 1e3, 3)
+        data = json.dumps(body).encode()
+        headers = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Internal Server Error')}",
+                   'Content-Type: application/json',
+                   f"Content-Length: {len(data)}",
+                   'Access-Control-Allow-Origin: *',
+                   'Connection: close']
+        if status == 503:
+            headers.append('Retry-After: 1')
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode() + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def dispatch(self, reader):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            raise BadRequest('Malformed request')
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, path, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise BadRequest('Malformed request line')
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        self.counters['requests'] += 1
+        if method == 'GET' and path == '/stats':
+            return 200, {'result': {**self.counters, 'in_flight': len(self.in_flight),
+                                    'workers': self.workers}}
+        if path not in JOBS:
+            raise BadRequest(f"Unknown route {path}", 404)
+        if method != 'POST':
+            raise BadRequest(f"{path} expects POST")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise BadRequest('Content-Length must be a non-negative integer')
+        if length > MAX_BODY:
+            raise BadRequest('Body too large', 413)
+        try:
+            payload = json.loads(await reader.readexactly(length))
+        except (asyncio.IncompleteReadError, ValueError):
+            raise BadRequest('Body is not valid JSON')
+        if not isinstance(payload, dict):
+            raise BadRequest('Body must be a JSON object')
+        check_payload(path, payload)
+        return await self.submit(path, payload)
+
+
+async def serve(host, port, workers=None, max_pending=None, timeout=10.0, cache=None):
+    service = SolveService(workers, max_pending, timeout, cache)
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving {len(JOBS)} routes on http://{host}:{port} with {service.workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local HTTP/JSON solve service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, help='Solver processes (default: CPU count)')
+    parser.add_argument('--max-pending', type=int, help='Distinct jobs before answering 503 (default: 4 per worker)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Default and maximum seconds per request')
+    parser.add_argument('--cache', metavar='PATH', help='SQLite solution cache shared by the workers')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_pending, args.timeout, args.cache))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
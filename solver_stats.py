@@ -0,0 +1,122 @@
+"""
+Shared instrumentation and stepping for the Queens, Zip and Tango solvers.
+
+A SolverStats object is passed to a solver as its `stats` argument. It is a
+dict of counters ('nodes', 'backtracks', plus solver specific ones such as
+'eliminations' or 'prunes'), a dict of per-phase wall-clock seconds, and an
+optional trace callback that receives (kind, data) events from the search.
+
+Solvers keep their counters in local variables and add them once when a
+phase ends, and only look at the trace callback when one is set, so
+passing stats=None (the default) costs nothing and passing a SolverStats
+without a trace costs a few additions per solve.
+
+stepped() turns a solver's tick generator (one that yields every K search
+nodes and returns its result) into the resumable, cancellable progress
+stream behind solve_queens_steps, solve_zip_steps and solve_grid_steps.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class SolverStats(dict):
+    """
+    Counters, phase timings and an optional event callback for one or more solves.
+
+    Args:
+        trace: Optional callable trace(kind, data) invoked for every search
+               event (e.g. 'node', 'backtrack', 'solution', 'done'); data
+               is a dict whose keys depend on the solver and event
+    """
+
+    def __init__(self, trace=None):
+        super().__init__()
+        self.phases = {}
+        self.trace = trace
+
+    def add(self, **counts):
+        """Add to the named counters (missing counters start at 0)."""
+        for name, value in counts.items():
+            self[name] = self.get(name, 0) + value
+
+    def add_phase(self, name, seconds):
+        """Add wall-clock seconds to a phase."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name):
+        """Time the body of a with-block as the named phase."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def emit(self, kind, **data):
+        """Send an event to the trace callback, if any."""
+        if self.trace is not None:
+            self.trace(kind, data)
+
+    def summary(self):
+        """Plain dict of the counters and phase times in milliseconds."""
+        return {
+            'counters': dict(self),
+            'phases_ms': {name: seconds * 1e3 for name, seconds in self.phases.items()},
+        }
+
+    def __repr__(self):
+        phases = ', '.join(f"{name}={seconds * 1e3:.2f}ms" for name, seconds in self.phases.items())
+        return f"SolverStats({dict.__repr__(self)}, phases=[{phases}])"
+
+
+def solve_with_stats(solve, *args, trace=None, **kwargs):
+    """
+    Run solve(*args, stats=..., **kwargs) with a fresh SolverStats.
+
+    Returns:
+        tuple: (result, SolverStats)
+    """
+    stats = SolverStats(trace)
+    return solve(*args, stats=stats, **kwargs), stats
+
+
+def stepped(search, every, node_limit=None, time_limit=None):
+    """
+    Drive a tick generator and report its progress.
+
+    search yields (anything) once every `every` nodes and returns the
+    solver's result (None when there is no solution). Between ticks the
+    caller gets control back; closing this generator cancels the search.
+    Budgets are checked at every tick, so they are enforced to within
+    `every` nodes.
+
+    Yields:
+        dict: {'done': False, 'nodes', 'elapsed'} after every tick, then one
+              final {'done': True, 'status', 'nodes', 'elapsed', 'result'}
+              where status is 'solved', 'unsolvable', 'node_limit' or
+              'timeout' (result is None unless solved)
+    """
+    start = time.monotonic()
+    nodes = 0
+    status, result = None, None
+    try:
+        while status is None:
+            try:
+                next(search)
+            except StopIteration as finished:
+                result = finished.value
+                status = 'unsolvable' if result is None else 'solved'
+                break
+            nodes += every
+            elapsed = time.monotonic() - start
+            if node_limit is not None and nodes >= node_limit:
+                status = 'node_limit'
+            elif time_limit is not None and elapsed >= time_limit:
+                status = 'timeout'
+            else:
+                yield {'done': False, 'nodes': nodes, 'elapsed': elapsed}
+    finally:
+        search.close()
+    yield {'done': True, 'status': status, 'nodes': nodes,
+           'elapsed': time.monotonic() - start, 'result': result}
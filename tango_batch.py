@@ -0,0 +1,102 @@
+# tango_batch.py — NumPy batch validation / solving front-end for Sun & Moon boards
+# Boards are stacked (B, N, N) int8 arrays: 1 = sun, 0 = moon, -1 = empty.
+# Pairs are (P, 4) arrays of (r1, c1, r2, c2) shared by every board, or (B, P, 4)
+# per board where rows with r1 < 0 are padding.
+from typing import List, NamedTuple, Optional
+import numpy as np
+
+from tango_solver import solve_grid
+
+class BatchReport(NamedTuple):
+    valid: np.ndarray        # (B,) board passes every check
+    row_balance: np.ndarray  # (B, N) row has the wrong sun/moon count
+    col_balance: np.ndarray  # (B, N) column has the wrong sun/moon count
+    row_triple: np.ndarray   # (B, N, N-2) three equal symbols start at (r, c) going right
+    col_triple: np.ndarray   # (B, N-2, N) three equal symbols start at (r, c) going down
+    equal: np.ndarray        # (B, P) broken = pair
+    opposite: np.ndarray     # (B, Q) broken × pair
+    empty: np.ndarray        # (B, N, N) empty cell (only a violation when complete=True)
+
+def as_boards(boards) -> np.ndarray:
+    arr = np.asarray(boards, dtype=np.int8)
+    if arr.ndim == 2: arr = arr[None]
+    if arr.ndim != 3 or arr.shape[1] != arr.shape[2] or arr.shape[1] % 2:
+        raise ValueError(f"Expected (B, N, N) boards with even N, got shape {arr.shape}")
+    return arr
+
+def pair_values(arr: np.ndarray, pairs):
+    """Values of both cells of every pair, (B, P) each, plus a (B, P) mask of real pairs"""
+    B = arr.shape[0]
+    pairs = np.asarray(pairs if pairs is not None else np.zeros((0, 4)), dtype=np.intp)
+    if pairs.size == 0:
+        empty = np.zeros((B, 0), dtype=np.int8)
+        return empty, empty, np.zeros((B, 0), dtype=bool)
+    if pairs.ndim == 2:
+        a = arr[:, pairs[:, 0], pairs[:, 1]]
+        b = arr[:, pairs[:, 2], pairs[:, 3]]
+        return a, b, np.ones(a.shape, dtype=bool)
+    real = pairs[..., 0] >= 0
+    safe = np.where(real[..., None], pairs, 0)
+    rows = np.arange(B)[:, None]
+    a = arr[rows, safe[..., 0], safe[..., 1]]
+    b = arr[rows, safe[..., 2], safe[..., 3]]
+    return a, b, real
+
+def validate_batch(boards, equals=None, opps=None, complete: bool = True) -> BatchReport:
+    """Check a whole stack of boards at once with vectorized counts and sliding windows.
+
+    complete=True demands full, exactly balanced boards; complete=False is the
+    partial check (no count above N/2, empty cells ignored everywhere).
+    """
+    arr = as_boards(boards)
+    n = arr.shape[1]
+    half = n // 2
+    suns, moons = arr == 1, arr == 0
+    if complete:
+        row_balance = (suns.sum(axis=2) != half) | (moons.sum(axis=2) != half)
+        col_balance = (suns.sum(axis=1) != half) | (moons.sum(axis=1) != half)
+    else:
+        row_balance = (suns.sum(axis=2) > half) | (moons.sum(axis=2) > half)
+        col_balance = (suns.sum(axis=1) > half) | (moons.sum(axis=1) > half)
+    a, b, c = arr[:, :, :-2], arr[:, :, 1:-1], arr[:, :, 2:]
+    row_triple = (a >= 0) & (a == b) & (b == c)
+    a, b, c = arr[:, :-2, :], arr[:, 1:-1, :], arr[:, 2:, :]
+    col_triple = (a >= 0) & (a == b) & (b == c)
+    a, b, real = pair_values(arr, equals)
+    equal = real & (a >= 0) & (b >= 0) & (a != b)
+    a, b, real = pair_values(arr, opps)
+    opposite = real & (a >= 0) & (b >= 0) & (a == b)
+    empty = arr < 0
+    valid = ~(row_balance.any(axis=1) | col_balance.any(axis=1)
+              | row_triple.any(axis=(1, 2)) | col_triple.any(axis=(1, 2))
+              | equal.any(axis=1) | opposite.any(axis=1))
+    if complete: valid &= ~empty.any(axis=(1, 2))
+    return BatchReport(valid, row_balance, col_balance, row_triple, col_triple, equal, opposite, empty)
+
+def board_pairs(pairs, k: int) -> List[List[int]]:
+    """Pairs of board k as plain lists for the scalar solvers"""
+    if pairs is None: return []
+    pairs = np.asarray(pairs)
+    if pairs.size == 0: return []
+    if pairs.ndim == 3: pairs = pairs[k][pairs[k][:, 0] >= 0]
+    return pairs.tolist()
+
+def solve_batch(boards, equals=None, opps=None, engine: str = 'bitmask') -> List[Optional[List[List[int]]]]:
+    """Solve a stack of boards; returns one solution grid (or None) per board.
+
+    A vectorized partial check drops boards that already break a rule, and
+    boards that are already complete and valid are returned as they are;
+    only the rest are dispatched to solve_grid one by one.
+    """
+    arr = as_boards(boards)
+    partial = validate_batch(arr, equals, opps, complete=False)
+    full = ~partial.empty.any(axis=(1, 2))
+    results: List[Optional[List[List[int]]]] = [None] * arr.shape[0]
+    for k in np.flatnonzero(partial.valid):
+        board = arr[k].tolist()
+        if full[k]:
+            results[k] = board
+            continue
+        grid = [[v if v >= 0 else None for v in row] for row in board]
+        results[k] = solve_grid(grid, board_pairs(equals, k), board_pairs(opps, k), engine=engine)
+    return results
@@ -1,11 +1,15 @@
 # tango_solver.py — Python CSP solver for Sun & Moon (Takuzu-like) + equal/opposite pairs
+import random
+import time
 from typing import List, Tuple, Optional
 
+from solver_stats import stepped
+
 N = 6  # 6x6 board
 Pair = Tuple[int,int,int,int]  # (r1,c1,r2,c2)
 
 def count_in_row(g, r, v): return sum(1 for x in g[r] if x==v)
-def count_in_col(g, c, v): return sum(1 for r in range(N) if g[r][c]==v)
+def count_in_col(g, c, v): return sum(1 for r in range(len(g)) if g[r][c]==v)
 
 def adjacency_ok_line(line: List[Optional[int]]) -> bool:
     for i in range(len(line)-2):
@@ -15,17 +19,19 @@ def adjacency_ok_line(line: List[Optional[int]]) -> bool:
     return True
 
 def adjacency_ok(g: List[List[Optional[int]]]) -> bool:
-    for r in range(N):
+    n = len(g)
+    for r in range(n):
         if not adjacency_ok_line(g[r]): return False
-    for c in range(N):
-        if not adjacency_ok_line([g[r][c] for r in range(N)]): return False
+    for c in range(n):
+        if not adjacency_ok_line([g[r][c] for r in range(n)]): return False
     return True
 
 def balance_ok_partial(g: List[List[Optional[int]]]) -> bool:
-    half = N//2
-    for r in range(N):
+    n = len(g)
+    half = n//2
+    for r in range(n):
         if count_in_row(g,r,1)>half or count_in_row(g,r,0)>half: return False
-    for c in range(N):
+    for c in range(n):
         if count_in_col(g,c,1)>half or count_in_col(g,c,0)>half: return False
     return True
 
@@ -45,140 +51,503 @@ def partial_valid(g, equals, opps) -> bool:
     return adjacency_ok(g) and balance_ok_partial(g) and equality_ok(g,equals) and opposite_ok(g,opps)
 
 def complete(g) -> bool:
-    for r in range(N):
-        for c in range(N):
+    for r in range(len(g)):
+        for c in range(len(g)):
             if g[r][c] not in (0,1):
                 return False
     return True
 
 def solved(g, equals, opps) -> bool:
     if not complete(g): return False
-    half=N//2
-    for r in range(N):
+    n=len(g); half=n//2
+    for r in range(n):
         if count_in_row(g,r,1)!=half: return False
-    for c in range(N):
+    for c in range(n):
         if count_in_col(g,c,1)!=half: return False
     return partial_valid(g,equals,opps)
 
-def build_domains(g, equals, opps):
-    dom = {}
-    for r in range(N):
-        for c in range(N):
-            dom[(r,c)] = [g[r][c]] if g[r][c] in (0,1) else [0,1]
-
-    changed=True
-    half=N//2
-    while changed:
-        changed=False
-        # balance pruning
-        for r in range(N):
-            suns = count_in_row(g,r,1); moons= count_in_row(g,r,0)
-            for c in range(N):
-                if g[r][c] in (0,1): continue
-                cand = dom[(r,c)]
-                new = [v for v in cand if not ((v==1 and suns+1>half) or (v==0 and moons+1>half))]
-                if new!=cand:
-                    dom[(r,c)] = new; changed=True
-                    if not new: return None
-        for c in range(N):
-            suns = count_in_col(g,c,1); moons= count_in_col(g,c,0)
-            for r in range(N):
-                if g[r][c] in (0,1): continue
-                cand = dom[(r,c)]
-                new = [v for v in cand if not ((v==1 and suns+1>half) or (v==0 and moons+1>half))]
-                if new!=cand:
-                    dom[(r,c)] = new; changed=True
-                    if not new: return None
-
-        # adjacency pruning
-        for r in range(N):
-            for c in range(N):
-                if g[r][c] in (0,1): continue
-                cand = dom[(r,c)]
-                line = g[r][:]
-                def okv(v):
-                    line[c]=v
-                    return adjacency_ok_line(line)
-                new=[v for v in cand if okv(v)]
-                if new!=cand:
-                    dom[(r,c)]=new; changed=True
-                    if not new: return None
-                line[c]=None
-        for c in range(N):
-            col = [g[r][c] for r in range(N)]
-            for r in range(N):
-                if g[r][c] in (0,1): continue
-                cand = dom[(r,c)]
-                def okv(v):
-                    col[r]=v
-                    res=adjacency_ok_line(col)
-                    col[r]=None
-                    return res
-                new=[v for v in cand if okv(v)]
-                if new!=cand:
-                    dom[(r,c)]=new; changed=True
-                    if not new: return None
-
-        # equals/opposites propagation
-        for (r1,c1,r2,c2) in equals:
-            a=g[r1][c1]; b=g[r2][c2]
-            if a in (0,1) and b not in (0,1):
-                if a in dom[(r2,c2)]: 
-                    if dom[(r2,c2)] != [a]: dom[(r2,c2)] = [a]; changed=True
-                else: return None
-            if b in (0,1) and a not in (0,1):
-                if b in dom[(r1,c1)]: 
-                    if dom[(r1,c1)] != [b]: dom[(r1,c1)] = [b]; changed=True
-                else: return None
-        for (r1,c1,r2,c2) in opps:
-            a=g[r1][c1]; b=g[r2][c2]
-            if a in (0,1) and b not in (0,1):
-                opt = 1-a
-                if opt in dom[(r2,c2)]: 
-                    if dom[(r2,c2)] != [opt]: dom[(r2,c2)] = [opt]; changed=True
-                else: return None
-            if b in (0,1) and a not in (0,1):
-                opt = 1-b
-                if opt in dom[(r1,c1)]: 
-                    if dom[(r1,c1)] != [opt]: dom[(r1,c1)] = [opt]; changed=True
-                else: return None
-    return dom
-
-def choose_cell(g, dom):
-    best=None; bestlen=99
-    for r in range(N):
-        for c in range(N):
-            if g[r][c] in (0,1): continue
-            l=len(dom[(r,c)])
-            if l<bestlen:
-                best=(r,c); bestlen=l
-    return best
-
-def backtrack(g, equals, opps):
-    dom = build_domains(g, equals, opps)
-    if dom is None: return None
-    if solved(g, equals, opps): return g
-    cell = choose_cell(g, dom)
-    if cell is None: return None
-    r,c = cell
-    for v in dom[(r,c)]:
-        g[r][c]=v
-        if partial_valid(g, equals, opps):
-            res = backtrack(g, equals, opps)
-            if res is not None: return res
-        g[r][c]=None
-    return None
+# Constraint kinds for the propagator
+LINE, WINDOW, EQUAL, OPPOSITE = range(4)
+
+class TangoPropagator:
+    """Cell values on a flat board (i = r*n + c, -1 = empty) with AC-3 style propagation.
+
+    Constraints are indexed by the cells they touch (watch[i]); assigning a
+    cell queues only those. Every assignment is pushed on a trail, so a
+    search node is undone with undo_to(mark) instead of rebuilding domains.
+    """
+    def __init__(self, n: int, equals: List[Pair], opps: List[Pair]):
+        self.n = n
+        self.half = n // 2
+        self.value = [-1] * (n * n)
+        self.lines = [[r*n + c for c in range(n)] for r in range(n)] + [[r*n + c for r in range(n)] for c in range(n)]
+        self.count = [[0, 0] for _ in self.lines]  # [moons, suns] placed per line
+        self.line_of = [(i // n, n + i % n) for i in range(n * n)]
+        self.constraints = [(LINE, l) for l in range(2 * n)]
+        for line in self.lines:
+            for k in range(n - 2):
+                self.constraints.append((WINDOW, line[k], line[k+1], line[k+2]))
+        for (r1,c1,r2,c2) in equals: self.constraints.append((EQUAL, r1*n + c1, r2*n + c2))
+        for (r1,c1,r2,c2) in opps: self.constraints.append((OPPOSITE, r1*n + c1, r2*n + c2))
+        self.watch = [[] for _ in range(n * n)]
+        for k, con in enumerate(self.constraints):
+            cells = self.lines[con[1]] if con[0] == LINE else con[1:]
+            for i in cells: self.watch[i].append(k)
+        self.trail = []
+        self.queue = []
+        self.queued = [False] * len(self.constraints)
+        # Search counters and optional trace(kind, data) callback for solutions()
+        self.nodes = self.backtracks = self.forced = 0
+        self.trace = None
+
+    def mark(self) -> int: return len(self.trail)
+
+    def undo_to(self, mark: int):
+        while len(self.trail) > mark:
+            i = self.trail.pop()
+            v = self.value[i]
+            self.value[i] = -1
+            for l in self.line_of[i]: self.count[l][v] -= 1
+
+    def assign(self, i: int, v: int) -> bool:
+        """Set cell i to v and queue its constraints; False on a clash"""
+        if self.value[i] != -1: return self.value[i] == v
+        self.value[i] = v
+        self.trail.append(i)
+        for l in self.line_of[i]: self.count[l][v] += 1
+        for k in self.watch[i]:
+            if not self.queued[k]:
+                self.queued[k] = True
+                self.queue.append(k)
+        return True
+
+    def revise(self, k: int) -> bool:
+        con = self.constraints[k]
+        value = self.value
+        kind = con[0]
+        if kind == LINE:
+            moons, suns = self.count[con[1]]
+            if suns > self.half or moons > self.half: return False
+            if suns == self.half or moons == self.half:
+                fill = 0 if suns == self.half else 1
+                for i in self.lines[con[1]]:
+                    if value[i] == -1 and not self.assign(i, fill): return False
+        elif kind == WINDOW:
+            a, b, c = value[con[1]], value[con[2]], value[con[3]]
+            if a == b == c != -1: return False
+            # Two equal symbols force the opposite into the third cell
+            if a == b != -1 and c == -1: return self.assign(con[3], 1 - a)
+            if a == c != -1 and b == -1: return self.assign(con[2], 1 - a)
+            if b == c != -1 and a == -1: return self.assign(con[1], 1 - b)
+        else:
+            flip = 0 if kind == EQUAL else 1
+            a, b = value[con[1]], value[con[2]]
+            if a != -1 and b != -1: return (a ^ b) == flip
+            if a != -1: return self.assign(con[2], a ^ flip)
+            if b != -1: return self.assign(con[1], b ^ flip)
+        return True
+
+    def propagate(self) -> bool:
+        """Run queued constraints to a fixpoint; False on a wipeout (queue is cleared either way)"""
+        queue = self.queue
+        while queue:
+            k = queue.pop()
+            self.queued[k] = False
+            if not self.revise(k):
+                for k in queue: self.queued[k] = False
+                queue.clear()
+                return False
+        return True
+
+    def load(self, grid) -> bool:
+        n = self.n
+        for r in range(n):
+            for c in range(n):
+                if grid[r][c] in (0,1) and not self.assign(r*n + c, grid[r][c]): return False
+        return self.propagate()
+
+    def choose_cell(self) -> int:
+        """Empty cell whose row and column are fullest, -1 when the board is full"""
+        n = self.n
+        best, best_score = -1, -1
+        for i, v in enumerate(self.value):
+            if v != -1: continue
+            r, c = self.line_of[i]
+            score = sum(self.count[r]) + sum(self.count[c])
+            if score > best_score: best, best_score = i, score
+        return best
+
+    def solutions(self, every: Optional[int] = None):
+        """Yield every completion as a flat value list (and None after every `every` nodes if set)"""
+        i = self.choose_cell()
+        if i == -1:
+            yield self.value[:]
+            return
+        trace = self.trace
+        for v in (0, 1):
+            mark = self.mark()
+            self.nodes += 1
+            if every and not self.nodes % every: yield None
+            if trace is not None: trace('node', {'cell': divmod(i, self.n), 'value': v, 'assigned': mark})
+            if self.assign(i, v) and self.propagate():
+                self.forced += len(self.trail) - mark - 1
+                yield from self.solutions(every)
+            self.undo_to(mark)
+            self.backtracks += 1
+            if trace is not None: trace('backtrack', {'cell': divmod(i, self.n), 'value': v, 'assigned': mark})
+
+def backtrack(g, equals, opps, stats=None):
+    """Fill g in place with the first solution (None if there is none).
+
+    stats (a SolverStats) receives 'nodes', 'backtracks' and 'forced'
+    (cells set by propagation during search), the 'setup' and 'search'
+    phase times and, with a trace set, 'node' / 'backtrack' / 'done' events.
+    """
+    started = time.perf_counter() if stats is not None else 0.0
+    n = len(g)
+    prop = TangoPropagator(n, equals, opps)
+    if stats is not None: prop.trace = stats.trace
+    solved = prop.load(g)
+    searching = time.perf_counter() if stats is not None else 0.0
+    if solved:
+        for values in prop.solutions():
+            for i, v in enumerate(values): g[i // n][i % n] = v
+            break
+        else:
+            solved = False
+    if stats is not None:
+        stats.add(nodes=prop.nodes, backtracks=prop.backtracks, forced=prop.forced)
+        stats.add_phase('setup', searching - started)
+        stats.add_phase('search', time.perf_counter() - searching)
+        if prop.trace is not None:
+            prop.trace('done', {'solved': solved, 'nodes': prop.nodes, 'backtracks': prop.backtracks})
+    return g if solved else None
+
+# ---- Bitmask engine (any even N) ----
+# A line is a pair of bitmasks (suns, moons); bit c is column c (or row c of a column).
+LINE_TABLES = {}
+
+def line_table(n: int) -> List[int]:
+    """Sun masks of every legal complete line of length n (balanced, no three in a row)"""
+    if n not in LINE_TABLES:
+        full = (1 << n) - 1
+        lines = []
+        for m in range(1 << n):
+            moons = full ^ m
+            if bin(m).count('1') == n // 2 and not (m & m >> 1 & m >> 2) and not (moons & moons >> 1 & moons >> 2):
+                lines.append(m)
+        LINE_TABLES[n] = lines
+    return LINE_TABLES[n]
+
+# (n, ((a, b, differ), ...)) -> legal lines that respect those in-line pairs
+LINE_FILTERS = {}
+
+# (filter key, known suns, known moons) -> (fitting lines, forced suns, forced moons)
+LINE_FITS = {}
+LINE_FITS_SIZE = 200000
+
+def filtered_lines(n: int, inside):
+    """Key and list of the legal lines that respect the in-line pairs"""
+    key = (n, tuple(sorted(inside)))
+    if key not in LINE_FILTERS:
+        LINE_FILTERS[key] = [m for m in line_table(n) if all((m >> a ^ m >> b ^ differ) & 1 == 0 for a, b, differ in inside)]
+    return key, LINE_FILTERS[key]
+
+def line_fit(key, known_s: int, known_m: int):
+    """Lines of a filter that fit the known cells, with the cells they all agree on (memoized)"""
+    fit = LINE_FITS.get((key, known_s, known_m))
+    if fit is None:
+        full = (1 << key[0]) - 1
+        ok = [m for m in LINE_FILTERS[key] if m & known_s == known_s and not m & known_m]
+        forced_s = forced_m = full
+        for m in ok:
+            forced_s &= m; forced_m &= ~m
+        if len(LINE_FITS) >= LINE_FITS_SIZE: LINE_FITS.clear()
+        fit = LINE_FITS[(key, known_s, known_m)] = (ok, forced_s, forced_m)
+    return fit
+
+def line_candidates(grid, equals: List[Pair], opps: List[Pair]):
+    """(filter key, legal lines) per row and per column, respecting the =/× pairs inside them"""
+    n = len(grid)
+    inside_rows = [[] for _ in range(n)]
+    inside_cols = [[] for _ in range(n)]
+    for pairs, differ in ((equals, 0), (opps, 1)):
+        for (r1,c1,r2,c2) in pairs:
+            if r1 == r2: inside_rows[r1].append((c1, c2, differ))
+            elif c1 == c2: inside_cols[c1].append((r1, r2, differ))
+    return [filtered_lines(n, inside) for inside in inside_rows], [filtered_lines(n, inside) for inside in inside_cols]
+
+def bitmask_solutions(grid, equals: List[Pair], opps: List[Pair], rng=None, every: Optional[int] = None, stats=None):
+    """Yield every solution as a list of row sun-masks; rows are the search variables.
 
-def solve_grid(grid: List[List[Optional[int]]], equals: List[Pair], opps: List[Pair]):
-    g = [[grid[r][c] if grid[r][c] in (0,1) else None for c in range(N)] for r in range(N)]
-    res = backtrack(g, equals, opps)
+    Lines are numbered 0..n-1 for rows and n..2n-1 for columns, and each
+    keeps its known suns / moons as bitmasks (ks / km). Propagation filters
+    a line's precomputed legal lines against its known cells; cells on
+    which all survivors agree become known and queue the crossing lines.
+    The search then fixes the open row with the fewest legal lines left to
+    each of them in turn (in random order when an rng is given).
+    With every set, None is also yielded after every `every` lines tried.
+    stats (a SolverStats) receives 'nodes' (lines tried) and 'backtracks'
+    once the generator finishes or is closed.
+    """
+    n = len(grid)
+    full = (1 << n) - 1
+    row_lines, col_lines = line_candidates(grid, equals, opps)
+    keys = [key for key, _ in row_lines + col_lines]
+    # Pairs that share neither a row nor a column are checked cell by cell
+    loose = [(r1,c1,r2,c2,d) for pairs, d in ((equals, 0), (opps, 1)) for (r1,c1,r2,c2) in pairs if r1 != r2 and c1 != c2]
+    ks, km = [0] * (2 * n), [0] * (2 * n)
+    queued = [False] * (2 * n)
+    nodes = backtracks = 0
+
+    def learn(r, c, v, queue):
+        """Record cell (r, c) = v and queue its row and column"""
+        if v: ks[r] |= 1 << c; ks[n + c] |= 1 << r
+        else: km[r] |= 1 << c; km[n + c] |= 1 << r
+        for k in (r, n + c):
+            if not queued[k]: queued[k] = True; queue.append(k)
+
+    def propagate(queue) -> bool:
+        while queue:
+            while queue:
+                k = queue.pop()
+                queued[k] = False
+                ok, forced_s, forced_m = line_fit(keys[k], ks[k], km[k])
+                if not ok:
+                    for k in queue: queued[k] = False
+                    return False
+                # Newly forced cells update this line at once and the crossing lines bit by bit
+                offset, bit = (n, 1 << k) if k < n else (0, 1 << (k - n))
+                for known, new in ((ks, forced_s & ~ks[k]), (km, forced_m & ~km[k])):
+                    known[k] |= new
+                    while new:
+                        j = (new & -new).bit_length() - 1
+                        new &= new - 1
+                        known[offset + j] |= bit
+                        if not queued[offset + j]: queued[offset + j] = True; queue.append(offset + j)
+            for r1,c1,r2,c2,d in loose:
+                for ra, ca, rb, cb in ((r1,c1,r2,c2), (r2,c2,r1,c1)):
+                    if not (ks[ra] | km[ra]) >> ca & 1: continue
+                    want = (ks[ra] >> ca & 1) ^ d
+                    if (ks[rb] | km[rb]) >> cb & 1:
+                        if (ks[rb] >> cb & 1) != want:
+                            for k in queue: queued[k] = False
+                            return False
+                    else:
+                        learn(rb, cb, want, queue)
+        return True
+
+    def search():
+        nonlocal nodes, backtracks
+        best = None
+        for r in range(n):
+            if ks[r] | km[r] == full: continue
+            ok = line_fit(keys[r], ks[r], km[r])[0]
+            if best is None or len(ok) < len(best[1]): best = (r, ok)
+        if best is None:
+            yield ks[:n]
+            return
+        r, ok = best
+        if rng is not None:
+            ok = ok[:]; rng.shuffle(ok)
+        saved = (ks[:], km[:])
+        for m in ok:
+            nodes += 1
+            if every and not nodes % every: yield None
+            queue = []
+            open_cells = full & ~(ks[r] | km[r])
+            for c in range(n):
+                if open_cells >> c & 1: learn(r, c, m >> c & 1, queue)
+            if propagate(queue):
+                yield from search()
+            ks[:], km[:] = saved[0][:], saved[1][:]
+            backtracks += 1
+
+    for r in range(n):
+        row = grid[r]
+        for c in range(n):
+            v = row[c]
+            if v == 1: ks[r] |= 1 << c; ks[n + c] |= 1 << r
+            elif v == 0: km[r] |= 1 << c; km[n + c] |= 1 << r
+    queue = list(range(2 * n))
+    queued[:] = [True] * (2 * n)
+    try:
+        if propagate(queue):
+            yield from search()
+    finally:
+        if stats is not None: stats.add(nodes=nodes, backtracks=backtracks)
+
+def solve_bitmask(grid: List[List[Optional[int]]], equals: List[Pair], opps: List[Pair], stats=None):
+    """stats (a SolverStats) receives 'nodes', 'backtracks' and the 'search' phase time"""
+    n = len(grid)
+    if n % 2: return None
+    started = time.perf_counter() if stats is not None else 0.0
+    solutions = bitmask_solutions(grid, equals, opps, stats=stats)
+    rows = next(solutions, None)
+    solutions.close()
+    if stats is not None: stats.add_phase('search', time.perf_counter() - started)
+    return None if rows is None else [[rows[r] >> c & 1 for c in range(n)] for r in range(n)]
+
+def solve_csp(grid: List[List[Optional[int]]], equals: List[Pair], opps: List[Pair], stats=None):
+    n = len(grid)
+    g = [[grid[r][c] if grid[r][c] in (0,1) else None for c in range(n)] for r in range(n)]
+    res = backtrack(g, equals, opps, stats=stats)
     return res
 
+TANGO_ENGINES = {'bitmask': solve_bitmask, 'csp': solve_csp}
+
+def solve_grid_steps(grid: List[List[Optional[int]]], equals: List[Pair], opps: List[Pair], engine: str = 'bitmask',
+                     every: int = 500, node_limit: Optional[int] = None, time_limit: Optional[float] = None, rng=None,
+                     stats=None):
+    """Stepping form of solve_grid: yields a progress report every `every` search nodes.
+
+    Closing the generator cancels the search; node_limit / time_limit end it
+    early. The final report's 'result' is the solved grid or None (see
+    solver_stats.stepped). rng shuffles the bitmask engine's line order.
+    stats (a SolverStats) gets the engine's 'nodes' and 'backtracks'.
+    """
+    if engine not in TANGO_ENGINES:
+        raise ValueError(f"Unknown Tango engine: {engine!r}")
+    n = len(grid)
+
+    def search():
+        if engine == 'csp':
+            prop = TangoPropagator(n, equals, opps)
+            if not prop.load(grid): return None
+            try:
+                for values in prop.solutions(every):
+                    if values is not None: return [values[r*n:(r+1)*n] for r in range(n)]
+                    yield
+                return None
+            finally:
+                if stats is not None: stats.add(nodes=prop.nodes, backtracks=prop.backtracks)
+        if n % 2: return None
+        for rows in bitmask_solutions(grid, equals, opps, rng=rng, every=every, stats=stats):
+            if rows is not None: return [[rows[r] >> c & 1 for c in range(n)] for r in range(n)]
+            yield
+        return None
+
+    return stepped(search(), every, node_limit, time_limit)
+
+def solve_grid(grid: List[List[Optional[int]]], equals: List[Pair], opps: List[Pair], engine: str = 'bitmask', stats=None):
+    """stats (a SolverStats) gets the engine's counters and phase times"""
+    if engine not in TANGO_ENGINES:
+        raise ValueError(f"Unknown Tango engine: {engine!r}")
+    return TANGO_ENGINES[engine](grid, equals, opps, stats=stats)
+
 def hint_cell(grid: List[List[Optional[int]]], equals: List[Pair], opps: List[Pair]):
-    sol = solve_grid(grid, equals, opps)
-    if sol is None: return None
-    for r in range(N):
-        for c in range(N):
-            if grid[r][c] not in (0,1):
-                return (r,c, sol[r][c])
+    hint = logical_hint(grid, equals, opps)
+    return None if hint is None else hint[:3]
+
+# ---- Counting and generation ----
+def count_solutions(grid: List[List[Optional[int]]], equals: List[Pair], opps: List[Pair], limit: Optional[int] = 2) -> int:
+    """Number of solutions, stopping early once limit is reached (limit=None counts all)"""
+    if len(grid) % 2: return 0
+    count = 0
+    for _ in bitmask_solutions(grid, equals, opps):
+        count += 1
+        if limit is not None and count >= limit: break
+    return count
+
+def random_full_board(n: int, rng) -> List[List[int]]:
+    for rows in bitmask_solutions([[None] * n for _ in range(n)], [], [], rng=rng):
+        return [[rows[r] >> c & 1 for c in range(n)] for r in range(n)]
+
+def forcing_rule(grid, equals: List[Pair], opps: List[Pair], r: int, c: int, v: int) -> Optional[str]:
+    """Name of a rule that forces empty cell (r, c) to v from its row, column and pairs alone"""
+    n = len(grid)
+    other = 1 - v
+    row, col = grid[r], [grid[i][c] for i in range(n)]
+    if sum(1 for x in row if x == other) == n // 2 or sum(1 for x in col if x == other) == n // 2:
+        return 'balance'
+    for line, k in ((row, c), (col, r)):
+        for a, b in ((k-2, k-1), (k-1, k+1), (k+1, k+2)):
+            if 0 <= a and b < n and line[a] == line[b] == other:
+                return 'no three in a row'
+    for pairs, differ, rule in ((equals, 0, 'equal pair'), (opps, 1, 'opposite pair')):
+        for (r1,c1,r2,c2) in pairs:
+            if (r1, c1) == (r, c): known = grid[r2][c2]
+            elif (r2, c2) == (r, c): known = grid[r1][c1]
+            else: continue
+            if known in (0, 1) and known ^ differ == v: return rule
     return None
+
+def generate_puzzle(n: int = N, rng=None, max_pairs: Optional[int] = None, pair_rate: float = 0.5):
+    """Make a uniquely solvable puzzle: returns (grid, equals, opps, solution).
+
+    Plants a random full board, then visits the cells in random order and
+    empties each one while the solution stays unique. When a cell cannot be
+    emptied, an =/× clue between it and a random neighbor (true in the
+    planted board) is tried instead (with probability pair_rate, up to
+    max_pairs clues, default n). Uniqueness needs no full count: the
+    puzzle was unique before, so any second solution must differ at the
+    emptied cell; it stays unique iff forcing the other value there (with
+    the new clue, if any) has no solution.
+    """
+    rng = rng or random.Random()
+    max_pairs = n if max_pairs is None else max_pairs
+    sol = random_full_board(n, rng)
+    grid = [row[:] for row in sol]
+    equals: List[Pair] = []
+    opps: List[Pair] = []
+    cells = [(r, c) for r in range(n) for c in range(n)]
+    rng.shuffle(cells)
+    for r, c in cells:
+        v = sol[r][c]
+        grid[r][c] = None
+        # A cell the remaining givens force by a single rule is redundant
+        if forcing_rule(grid, equals, opps, r, c, v) is not None: continue
+        grid[r][c] = 1 - v
+        unique = count_solutions(grid, equals, opps, limit=1) == 0
+        grid[r][c] = None
+        if unique: continue
+        if len(equals) + len(opps) < max_pairs and rng.random() < pair_rate:
+            nbs = [(r+dr, c+dc) for dr, dc in ((0,1),(1,0),(0,-1),(-1,0)) if 0 <= r+dr < n and 0 <= c+dc < n]
+            r2, c2 = rng.choice(nbs)
+            pair = (r, c, r2, c2)
+            kind = equals if sol[r][c] == sol[r2][c2] else opps
+            kind.append(pair)
+            grid[r][c] = 1 - v
+            unique = count_solutions(grid, equals, opps, limit=1) == 0
+            grid[r][c] = None
+            if unique: continue
+            kind.pop()
+        grid[r][c] = v
+    return grid, equals, opps, sol
+
+# ---- Logical hints ----
+def logical_hint(grid: List[List[Optional[int]]], equals: List[Pair], opps: List[Pair], search: bool = True):
+    """Next move a player can deduce, as (r, c, value, rule).
+
+    Single rules come first (balance, no three in a row, equal/opposite
+    pair), then whole-line reasoning: a cell on which every legal way to
+    complete its row or column agrees. Only when propagation is stuck
+    does it fall back to a full search (rule 'search', or None with
+    search=False). Returns None on a broken or finished board.
+    """
+    n = len(grid)
+    g = [[grid[r][c] if grid[r][c] in (0,1) else None for c in range(n)] for r in range(n)]
+    if not partial_valid(g, equals, opps): return None
+    empty = [(r, c) for r in range(n) for c in range(n) if g[r][c] is None]
+    if not empty: return None
+    for r, c in empty:
+        for v in (0, 1):
+            rule = forcing_rule(g, equals, opps, r, c, v)
+            if rule is not None: return (r, c, v, rule)
+    row_lines, col_lines = line_candidates(g, equals, opps)
+    for k, (key, _) in enumerate(row_lines + col_lines):
+        cells = g[k] if k < n else [g[i][k - n] for i in range(n)]
+        known_s = sum(1 << i for i, v in enumerate(cells) if v == 1)
+        known_m = sum(1 << i for i, v in enumerate(cells) if v == 0)
+        ok, forced_s, forced_m = line_fit(key, known_s, known_m)
+        if not ok: return None
+        for v, new in ((1, forced_s & ~known_s), (0, forced_m & ~known_m)):
+            if new:
+                i = (new & -new).bit_length() - 1
+                return (k, i, v, 'row completion') if k < n else (i, k - n, v, 'column completion')
+    if not search: return None
+    sol = solve_grid(g, equals, opps)
+    if sol is None: return None
+    r, c = empty[0]
+    return (r, c, sol[r][c], 'search')
+
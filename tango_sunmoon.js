@@ -9,7 +9,7 @@ const connEl = document.getElementById('connectors');
 
 let selected=null;
 let givens=new Set();
-let py=null, pySolve=null, pyHint=null;
+let py=null, pySolveSteps=null, pyHint=null, pyGenerate=null, pyLogicalHint=null;
 let pyReady = null;
 
 // Randomizable constraints (will be filled at runtime)
@@ -182,10 +182,14 @@ async function ensurePy(){
   document.getElementById('loader').style.display = 'block';
   pyReady = (async ()=>{
     py = await loadPyodide();
+    // The solver imports solver_stats from Pyodide's file system
+    py.FS.writeFile('solver_stats.py', await (await fetch('solver_stats.py')).text());
     const code = await (await fetch('tango_solver.py')).text();
     await py.runPythonAsync(code);
-    pySolve = py.globals.get('solve_grid');
+    pySolveSteps = py.globals.get('solve_grid_steps');
     pyHint = py.globals.get('hint_cell');
+    pyGenerate = py.globals.get('generate_puzzle');
+    pyLogicalHint = py.globals.get('logical_hint');
     document.getElementById('hintBtn').disabled=false;
     document.getElementById('solveBtn').disabled=false;
     document.getElementById('loader').style.display = 'none';
@@ -195,12 +199,45 @@ async function ensurePy(){
   return pyReady;
 }
 
+// Run solve_grid_steps, handing control back to the browser between steps.
+// Resolves to the solution, null if there is none, or undefined if a newer
+// solve (search.cancelled) took over.
+let activeSolve = null;
+async function solveStepped(grid, search=null){
+  const args = [grid, EQUALS, OPPOS].map(v=>py.toPy(v));
+  const steps = pySolveSteps(...args);
+  try{
+    while(true){
+      const report = steps.next().value;
+      if(report.get('done')){
+        const result = report.get('result');
+        report.destroy();
+        if(!result) return null;
+        const sol = result.toJs();
+        result.destroy();
+        return sol;
+      }
+      report.destroy();
+      await new Promise(res=>setTimeout(res,0));
+      if(search && search.cancelled) return undefined;
+    }
+  } finally {
+    // Closes the Python generator, which abandons an unfinished search
+    steps.return();
+    steps.destroy();
+    args.forEach(a=>a.destroy());
+  }
+}
+
 // Solve step-by-step
 document.getElementById('solveBtn').addEventListener('click', async ()=>{
   const start = readGrid();
   await ensurePy();
-  const solObj = pySolve(start, EQUALS, OPPOS);
-  const sol = solObj && solObj.toJs ? solObj.toJs() : null;
+  if(activeSolve) activeSolve.cancelled = true;
+  const search = {cancelled:false};
+  activeSolve = search;
+  const sol = await solveStepped(start, search);
+  if(sol === undefined) return;
   if(!sol){ log('No solution.'); return; }
   const cells = [];
   for(let r=0;r<N;r++) for(let c=0;c<N;c++){
@@ -214,68 +251,47 @@ document.getElementById('solveBtn').addEventListener('click', async ()=>{
   log('Solved step-by-step.');
 });
 
-// Random Puzzle with RANDOM = and ×
+// Random Puzzle: solver-backed generator (unique solution, random = and ×)
 document.getElementById('randomBtn').addEventListener('click', async ()=>{
   givens.clear();
   for(let r=0;r<N;r++) for(let c=0;c<N;c++) setCell(r,c,null);
 
   await ensurePy();
-  const empty = Array.from({length:N},()=>Array(N).fill(null));
-  const solObj = pySolve(empty, EQUALS, OPPOS);
-  const sol = solObj && solObj.toJs ? solObj.toJs() : null;
-  if(!sol){ log('Cannot generate puzzle.'); return; }
-
-  // Create new random constraints
-  EQUALS = [];
-  OPPOS = [];
-  const directions = [[0,1],[1,0]];
-  for (let r=0;r<N;r++){
-    for (let c=0;c<N;c++){
-      for (const [dr,dc] of directions){
-        const r2 = r+dr, c2 = c+dc;
-        if(r2 < N && c2 < N && Math.random() < 0.15){
-          if(sol[r][c] === sol[r2][c2]) EQUALS.push([r,c,r2,c2]);
-          else OPPOS.push([r,c,r2,c2]);
-        }
-      }
-    }
-  }
-  // limit opposites to avoid too many ×
-  if(OPPOS.length > 6) OPPOS = OPPOS.slice(0,6);
+  const genObj = pyGenerate(N);
+  const gen = genObj && genObj.toJs ? genObj.toJs() : null;
+  if(genObj && genObj.destroy) genObj.destroy();
+  if(!gen){ log('Cannot generate puzzle.'); return; }
+  const [grid, eqs, ops] = gen;
+
+  EQUALS = eqs.map(p=>Array.from(p));
+  OPPOS = ops.map(p=>Array.from(p));
 
   renderPairs();
   drawConnectors();
 
-  const cells = [];
-  for(let r=0;r<N;r++) for(let c=0;c<N;c++) cells.push([r,c]);
-  for(let i=cells.length-1;i>0;i--){ const j=Math.floor(Math.random()*(i+1)); [cells[i],cells[j]]=[cells[j],cells[i]]; }
-
-  const minGive = Math.floor(N*N*0.25), maxGive = Math.floor(N*N*0.4);
-  const giveCount = Math.floor(Math.random()*(maxGive-minGive+1))+minGive;
-  for(let k=0;k<giveCount;k++){
-    const [r,c]=cells[k];
-    setCell(r,c, sol[r][c], {prefill:true});
+  for(let r=0;r<N;r++) for(let c=0;c<N;c++){
+    if(grid[r][c] === 0 || grid[r][c] === 1) setCell(r,c, grid[r][c], {prefill:true});
   }
   drawConnectors();
   // validate all prefills
   for(let r=0;r<N;r++) for(let c=0;c<N;c++) validateCell(r,c);
-  log('Random puzzle ready.');
+  log('Random puzzle ready (unique solution).');
 });
 
-// Hint (random empty from solution)
+// Hint (next logical move, with the rule that forces it)
 document.getElementById('hintBtn').addEventListener('click', async ()=>{
   const g = readGrid();
   await ensurePy();
-  const solObj = pySolve(g, EQUALS, OPPOS);
-  const sol = solObj && solObj.toJs ? solObj.toJs() : null;
-  if(!sol){ log('No hint (unsatisfiable).'); return; }
-  const empties = [];
-  for(let r=0;r<N;r++) for(let c=0;c<N;c++) if(getCell(r,c)===null) empties.push([r,c]);
-  if(empties.length===0){ log('Board already complete.'); return; }
-  const pick = empties[Math.floor(Math.random()*empties.length)];
-  const [rr,cc] = pick; const val = sol[rr][cc];
+  let empty = 0;
+  for(let r=0;r<N;r++) for(let c=0;c<N;c++) if(getCell(r,c)===null) empty++;
+  if(empty===0){ log('Board already complete.'); return; }
+  const hintObj = pyLogicalHint(g, EQUALS, OPPOS);
+  const hint = hintObj && hintObj.toJs ? hintObj.toJs() : null;
+  if(hintObj && hintObj.destroy) hintObj.destroy();
+  if(!hint){ log('No hint (unsatisfiable).'); return; }
+  const [rr,cc,val,rule] = hint;
   setCell(rr,cc,val);
-  log(`Hint: (${rr+1},${cc+1}) ${(val===1?'☀️':'🌙')}`);
+  log(`Hint: (${rr+1},${cc+1}) ${(val===1?'☀️':'🌙')} — ${rule}`);
 });
 
 // RESET
@@ -294,8 +310,7 @@ function checkSolved(){
   (async ()=>{
     await ensurePy();
     const g = readGrid();
-    const solObj = pySolve(g, EQUALS, OPPOS);
-    const sol = solObj && solObj.toJs ? solObj.toJs() : null;
+    const sol = await solveStepped(g);
     if(!sol) return false;
     for(let r=0;r<N;r++) for(let c=0;c<N;c++) if(sol[r][c] !== getCell(r,c)) return false;
     document.getElementById('successModal').style.display = 'flex';
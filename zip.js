@@ -9,6 +9,10 @@ async function initPyodideAndSolver() {
         }).then(async (py) => {
             pyodide = py;
             
+            // The solver imports solver_stats from Pyodide's file system
+            const statsCode = await (await fetch("solver_stats.py")).text();
+            py.FS.writeFile("solver_stats.py", statsCode);
+
             // Load the solver code
             const solverCode = await (await fetch("zip_solver.py")).text();
             await py.runPythonAsync(solverCode);
@@ -85,14 +89,28 @@ function visualizeSolution(solution, givenGrid) {
     }
 }
 
+// Search currently stepping in the background; a new solve cancels it
+let activeSearch = null;
+
 async function solvePuzzle() {
+    let steps = null;
     try {
         const py = await initPyodideAndSolver();
         const grid = getGrid();
         
-        // Call Python solver
-        py.globals.set("grid", grid);
-        const result = await py.runPythonAsync(`solve_zip(grid)`);
+        // Step the Python solver, yielding to the browser between chunks
+        if (activeSearch) activeSearch.cancelled = true;
+        const search = { cancelled: false };
+        activeSearch = search;
+        steps = py.globals.get("solve_zip_steps")(py.toPy(grid));
+        let report = null;
+        while (true) {
+            report = steps.next().value;
+            if (report.get("done")) break;
+            await new Promise(resolve => setTimeout(resolve, 0));
+            if (search.cancelled) return;
+        }
+        const result = report.get("result");
         const solution = result ? result.toJs() : null;
         
         if (!solution) {
@@ -104,6 +122,12 @@ async function solvePuzzle() {
     } catch (error) {
         console.error("Error solving puzzle:", error);
         alert("Error solving puzzle: " + error.message);
+    } finally {
+        // Closes the Python generator, which abandons an unfinished search
+        if (steps) {
+            steps.return();
+            steps.destroy();
+        }
     }
 }
 
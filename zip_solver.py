@@ -1,5 +1,15 @@
 # zip_solver.py - Enhanced LinkedIn Zip Puzzle Solver
 import random
+import time
+from collections import OrderedDict
+
+from solver_stats import stepped
+
+class ZipSearchLimit(Exception):
+    """Raised when a search runs out of its node budget"""
+
+class ZipTimeout(ZipSearchLimit, TimeoutError):
+    """Raised when a search runs past its wall-clock deadline"""
 
 def neighbors(r, c, H, W):
     """Return valid orthogonal neighbors"""
@@ -43,53 +53,344 @@ def validate_givens_adjacency(givens, H, W):
                 return False
     return True
 
-def solve_zip_backtrack(grid, current_num, target_num, path, givens):
-    """Enhanced backtracking with intelligent neighbor ordering"""
+def build_adjacency(H, W):
+    """Flat neighbor table: adjacency[i] lists the orthogonal neighbors of cell i = r * W + c"""
+    adjacency = []
+    for r in range(H):
+        for c in range(W):
+            adjacency.append(tuple(nr * W + nc for nr, nc in neighbors(r, c, H, W)))
+    return adjacency
+
+def splits_region(cell, unvisited, H, W):
+    """Local test: could removing cell cut its unvisited 4-neighbors apart?
+
+    Walks the 8-cell ring around cell; unvisited orthogonal neighbors joined
+    through an unvisited corner form one group. A single group stays
+    connected after the removal, so the full flood fill can be skipped.
+    """
+    r, c = divmod(cell, W)
+    ring = []
+    for dr, dc in ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)):
+        nr, nc = r + dr, c + dc
+        ring.append(0 <= nr < H and 0 <= nc < W and unvisited[nr * W + nc] == 1)
+    groups = 0
+    for k in range(0, 8, 2):
+        # Each orthogonal neighbor starts a new group unless the previous
+        # orthogonal one is unvisited and the corner between them is too
+        if ring[k] and not (ring[k - 2] and ring[k - 1]):
+            groups += 1
+    if groups == 0 and all(ring[k] for k in range(0, 8, 2)):
+        groups = 1
+    return groups > 1
+
+def solve_zip_backtrack(grid, current_num, target_num, path, givens, prune=True,
+                        rng=None, node_limit=None, deadline=None, stats=None, limit=None):
+    """Iterative backtracking with an explicit stack and a shared path buffer.
+
+    The path is one preallocated list of flat cell indices (r * W + c),
+    free cells live in a bytearray and each depth keeps its (at most four)
+    candidate moves in a flat slot table, so no step allocates or recurses.
+    Candidates are tried nearest-first towards the next given number.
+
+    With prune=True a partial path is rejected as soon as
+    - the next given number is too far away (Manhattan distance) or has
+      the wrong parity for the number of steps left to reach it,
+    - some unvisited cell has no unvisited/head neighbor left, or more
+      than one has a single one (only the path's end may be a dead end),
+    - the unvisited cells are no longer connected to the path head.
+    Neighbor degrees are kept incrementally; only a move that can split
+    the unvisited area locally pays for a flood fill.
+
+    rng (a random.Random) breaks distance ties randomly instead of in
+    neighbor order. After node_limit moves ZipSearchLimit is raised, and
+    ZipTimeout once time.monotonic() passes deadline.
+
+    stats (a SolverStats) receives 'nodes', 'backtracks', 'prunes'
+    (rejected partial paths) and 'flood_fills', the 'setup' and 'search'
+    phase times, and with a trace set 'node' / 'backtrack' / 'done' events;
+    it is filled in even when a limit is raised.
+
+    Returns the full path as [(r, c), ...] (numbers 1..target_num) and
+    writes the placed numbers into grid, or returns None. With limit set
+    the search goes on past the first solution instead and returns a list
+    of up to limit full paths (grid is left alone).
+    """
+    search = zip_search(grid, current_num, target_num, path, givens, prune,
+                        rng, node_limit, deadline, stats, limit=limit)
+    try:
+        next(search)
+    except StopIteration as finished:
+        return finished.value
+
+def zip_search(grid, current_num, target_num, path, givens, prune=True,
+               rng=None, node_limit=None, deadline=None, stats=None, every=None, limit=None):
+    """Generator form of solve_zip_backtrack (same arguments and result)
+
+    With every set it yields None after every `every` moves so the caller
+    can pause, resume or abandon (close) the search; the result is the
+    generator's return value.
+    """
+    started = time.perf_counter() if stats is not None else 0.0
+    trace = stats.trace if stats is not None else None
     H, W = len(grid), len(grid[0])
-    
-    # Base case: we've placed all numbers
-    if current_num > target_num:
-        return path
-    
-    # If this number is already given
-    if current_num in givens:
-        r, c = givens[current_num]
-        # Check if it's adjacent to previous number
-        if len(path) > 0:
-            prev_r, prev_c = path[-1]
-            if abs(r - prev_r) + abs(c - prev_c) != 1:
-                return None  # Given number is not adjacent to path
-        return solve_zip_backtrack(grid, current_num + 1, target_num, path + [(r, c)], givens)
-    
-    # Current number is not given, need to place it
-    if len(path) == 0:
-        return None  # Should have at least number 1 given
-    
-    last_r, last_c = path[-1]
-    
-    # Get neighbors and prioritize those leading toward next given
-    nbr_list = list(neighbors(last_r, last_c, H, W))
-    
-    # If next given number exists, prioritize neighbors closer to it
-    if current_num + 1 in givens:
-        target_r, target_c = givens[current_num + 1]
-        nbr_list.sort(key=lambda pos: abs(pos[0] - target_r) + abs(pos[1] - target_c))
-    
-    # Try each neighbor
-    for nr, nc in nbr_list:
-        if grid[nr][nc] == 0:  # Empty cell
-            # Place the number
-            grid[nr][nc] = current_num
-            result = solve_zip_backtrack(grid, current_num + 1, target_num, path + [(nr, nc)], givens)
-            if result is not None:
-                return result
-            # Backtrack
-            grid[nr][nc] = 0
-    
-    return None
+    total = H * W
+    adjacency = build_adjacency(H, W)
+
+    # given_cell[num] -> flat cell of a given number, -1 otherwise
+    given_cell = [-1] * (target_num + 2)
+    for num, (r, c) in givens.items():
+        if num <= target_num:
+            given_cell[num] = r * W + c
+    # aim_num[num] -> next given number at or after num (the search heads for it)
+    aim_num = [0] * (target_num + 2)
+    for num in range(target_num, 0, -1):
+        aim_num[num] = num if given_cell[num] >= 0 else aim_num[num + 1]
+    end_cell = given_cell[target_num]
 
-def solve_zip_with_restarts(grid, max_restarts=3):
-    """Try solving with random restarts for difficult puzzles"""
+    free = bytearray(1 if grid[i // W][i % W] == 0 else 0 for i in range(total))
+    unvisited = bytearray(total)
+    for num in range(1, target_num + 1):
+        if given_cell[num] >= 0:
+            unvisited[given_cell[num]] = 1
+    for i in range(total):
+        if free[i]:
+            unvisited[i] = 1
+    cells = [0] * target_num
+    for k, (r, c) in enumerate(path):
+        cells[k] = r * W + c
+        free[r * W + c] = 0
+        unvisited[r * W + c] = 0
+    base = len(path)
+    if base >= target_num:
+        done = path if current_num > target_num else None
+        return done if limit is None else [done] if done else []
+    if base == 0:
+        # Number 1 has to be given; it starts the path
+        if given_cell[1] < 0:
+            return None if limit is None else []
+        cells[0] = given_cell[1]
+        unvisited[cells[0]] = 0
+        base = 1
+        if target_num == 1:
+            return [divmod(cells[0], W)] if limit is None else [[divmod(cells[0], W)]]
+
+    # deg[i]: unvisited neighbors of i plus one if i touches the head
+    head = cells[base - 1]
+    deg = [0] * total
+    dead = 0
+    remaining = 0
+    for i in range(total):
+        if unvisited[i]:
+            remaining += 1
+            for nb in adjacency[i]:
+                if unvisited[nb] or nb == head:
+                    deg[i] += 1
+            if deg[i] <= 1:
+                dead += 1
+    stamp = bytearray(total)
+    fills = 0
+
+    def connected(head):
+        """Flood fill: are all unvisited cells reachable from the head?"""
+        nonlocal fills
+        fills += 1
+        for i in range(total):
+            stamp[i] = 0
+        stack = [nb for nb in adjacency[head] if unvisited[nb]]
+        for nb in stack:
+            stamp[nb] = 1
+        seen = len(stack)
+        while stack:
+            for nb in adjacency[stack.pop()]:
+                if unvisited[nb] and not stamp[nb]:
+                    stamp[nb] = 1
+                    seen += 1
+                    stack.append(nb)
+        return seen == remaining
+
+    def viable(d):
+        """Prune checks after the move from cells[d - 2] to the head cells[d - 1]"""
+        head = cells[d - 1]
+        if dead > 1 or (dead == 1 and end_cell >= 0 and unvisited[end_cell] and deg[end_cell] > 1):
+            return False
+        num = aim_num[d + 1] if d < target_num else 0
+        if num:
+            g = given_cell[num]
+            dist = abs(head // W - g // W) + abs(head % W - g % W)
+            steps = num - d
+            if dist > steps or (steps - dist) & 1:
+                return False
+        if remaining:
+            # Unvisited cells plus the head stayed connected unless leaving
+            # the old head cut its neighborhood apart
+            unvisited[head] = 1
+            split = splits_region(cells[d - 2], unvisited, H, W)
+            unvisited[head] = 0
+            if split and not connected(head):
+                return False
+        return True
+
+    cand = [0] * (4 * target_num)
+    keys = [0.0] * (4 * target_num)
+    ncand = [0] * (target_num + 1)
+    ptr = [0] * (target_num + 1)
+
+    def expand(d):
+        """Fill the candidate slots for depth d (placing number d + 1)"""
+        num = d + 1
+        slot = 4 * d
+        g = given_cell[num]
+        if g >= 0:
+            count = 1 if g in adjacency[cells[d - 1]] else 0
+            cand[slot] = g
+        else:
+            count = 0
+            aim = given_cell[aim_num[num]] if aim_num[num] else -1
+            for nb in adjacency[cells[d - 1]]:
+                if free[nb]:
+                    # Insertion sort by Manhattan distance to the aim cell,
+                    # ties broken by the rng when one is given
+                    key = abs(nb // W - aim // W) + abs(nb % W - aim % W) if aim >= 0 else 0
+                    if rng is not None:
+                        key += rng.random()
+                    k = slot + count
+                    while k > slot and keys[k - 1] > key:
+                        cand[k] = cand[k - 1]
+                        keys[k] = keys[k - 1]
+                        k -= 1
+                    cand[k] = nb
+                    keys[k] = key
+                    count += 1
+        ncand[d] = count
+        ptr[d] = 0
+
+    nodes = backtracks = prunes = 0
+    found = []
+    searching = time.perf_counter() if stats is not None else 0.0
+    try:
+        if prune and not connected(head):
+            prunes += 1
+            return None if limit is None else found
+        d = base
+        expand(d)
+        while True:
+            if ptr[d] < ncand[d]:
+                nodes += 1
+                if node_limit is not None and nodes > node_limit:
+                    raise ZipSearchLimit(f"Node budget of {node_limit} exhausted")
+                if deadline is not None and not nodes & 1023 and time.monotonic() > deadline:
+                    raise ZipTimeout("Zip search timed out")
+                if every and not nodes % every:
+                    yield
+                cell = cand[4 * d + ptr[d]]
+                ptr[d] += 1
+                if trace is not None:
+                    trace('node', {'num': d + 1, 'cell': divmod(cell, W)})
+                # Move the head from cells[d - 1] to cell
+                old_head = cells[d - 1]
+                cells[d] = cell
+                free[cell] = 0
+                unvisited[cell] = 0
+                remaining -= 1
+                if deg[cell] <= 1:
+                    dead -= 1
+                isolated = False
+                for nb in adjacency[old_head]:
+                    if unvisited[nb]:
+                        deg[nb] -= 1
+                        if deg[nb] == 1:
+                            dead += 1
+                        elif deg[nb] == 0:
+                            isolated = True
+                d += 1
+                if d == target_num:
+                    if limit is None:
+                        break
+                    # Counting: record the path and backtrack out of it
+                    found.append([divmod(cells[k], W) for k in range(target_num)])
+                    if len(found) >= limit:
+                        return found
+                    ncand[d] = 0
+                    ptr[d] = 0
+                    continue
+                if not prune or (not isolated and viable(d)):
+                    expand(d)
+                    continue
+                prunes += 1
+                ncand[d] = 0
+                ptr[d] = 0
+            else:
+                d -= 1
+                if d < base:
+                    return None if limit is None else found
+                backtracks += 1
+                if trace is not None:
+                    trace('backtrack', {'num': d + 1, 'cell': divmod(cells[d], W)})
+                # Undo the move into cells[d]
+                cell = cells[d]
+                old_head = cells[d - 1]
+                for nb in adjacency[old_head]:
+                    if unvisited[nb]:
+                        if deg[nb] == 1:
+                            dead -= 1
+                        deg[nb] += 1
+                if deg[cell] <= 1:
+                    dead += 1
+                remaining += 1
+                unvisited[cell] = 1
+                if given_cell[d + 1] < 0:
+                    free[cell] = 1
+
+        result = []
+        for k in range(target_num):
+            r, c = divmod(cells[k], W)
+            if grid[r][c] == 0:
+                grid[r][c] = k + 1
+            result.append((r, c))
+        return result
+    finally:
+        if stats is not None:
+            stats.add(nodes=nodes, backtracks=backtracks, prunes=prunes, flood_fills=fills)
+            stats.add_phase('setup', searching - started)
+            stats.add_phase('search', time.perf_counter() - searching)
+            if trace is not None:
+                trace('done', {'nodes': nodes, 'backtracks': backtracks, 'prunes': prunes})
+
+def luby(i):
+    """i-th term (1-based) of the Luby restart sequence 1, 1, 2, 1, 1, 2, 4, ..."""
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    if i == (1 << k) - 1:
+        return 1 << (k - 1)
+    return luby(i - (1 << (k - 1)) + 1)
+
+def solve_zip_with_restarts(grid, max_restarts=None, time_limit=None, node_unit=None, seed=None,
+                            stats=None):
+    """Try solving with random restarts for difficult puzzles
+
+    Attempt i runs with a node budget of node_unit * luby(i); the first
+    attempt keeps the plain nearest-first order, later ones break ties with
+    a seeded rng so each restart explores a different tree. An attempt that
+    finishes inside its budget is complete: its answer (path or None) is
+    final. With max_restarts set, None is also returned once that many
+    attempts were cut off.
+
+    stats (a SolverStats) accumulates the counters of every attempt plus
+    'restarts', the number of attempts cut off by their budget.
+
+    Raises ZipTimeout if time_limit seconds pass without an answer.
+    """
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    search = restart_search(grid, max_restarts, deadline, node_unit, seed, stats)
+    try:
+        next(search)
+    except StopIteration as finished:
+        return finished.value
+
+def restart_search(grid, max_restarts=None, deadline=None, node_unit=None, seed=None,
+                   stats=None, every=None):
+    """Generator form of solve_zip_with_restarts, yielding every `every` moves (see zip_search)"""
     H, W = len(grid), len(grid[0])
     target_num = H * W
     
@@ -102,26 +403,278 @@ def solve_zip_with_restarts(grid, max_restarts=3):
     if 1 not in givens:
         return None
     
-    for attempt in range(max_restarts):
+    node_unit = node_unit or 512 * target_num
+    rng = random.Random(seed)
+    attempt = 0
+    while max_restarts is None or attempt < max_restarts:
+        attempt += 1
         grid_copy = [row[:] for row in grid]
-        result = solve_zip_backtrack(grid_copy, 1, target_num, [], givens)
+        try:
+            result = yield from zip_search(grid_copy, 1, target_num, [], givens,
+                                           rng=rng if attempt > 1 else None,
+                                           node_limit=node_unit * luby(attempt),
+                                           deadline=deadline, stats=stats, every=every)
+        except ZipTimeout:
+            raise
+        except ZipSearchLimit:
+            if stats is not None:
+                stats.add(restarts=1)
+            continue
         
-        if result is not None and len(result) == target_num:
-            solution = {}
-            for i, (r, c) in enumerate(result):
-                solution[i + 1] = (r, c)
-            return solution
+        if result is None or len(result) != target_num:
+            return None
+        solution = {}
+        for i, (r, c) in enumerate(result):
+            solution[i + 1] = (r, c)
+        return solution
     
     return None
 
-def solve_zip(input_grid):
-    """Main solver function - returns path as dictionary {num: (r,c)}"""
+def segment_paths(start, end, length, blocked, adjacency, W, limit, budget=None):
+    """All simple paths of exactly length steps from start to end
+
+    Paths avoid the cells in the blocked bitmask (other givens) and are
+    returned as (mask, cells) pairs: cells runs from the cell after start
+    up to and including end, mask holds the cells strictly in between.
+    Returns None once more than limit paths exist, or once the search has
+    taken more than budget steps (long, open segments).
+    """
+    er, ec = divmod(end, W)
+    paths = []
+    cells = [0] * length
+    # Explicit stack (long segments would overflow the recursion limit):
+    # frame k holds the neighbors still to try for cells[k]
+    stack = [iter(adjacency[start])]
+    mask = 1 << start
+    steps = 0
+    while stack:
+        step = len(stack) - 1
+        left = length - step - 1
+        for nb in stack[-1]:
+            bit = 1 << nb
+            if mask & bit or blocked & bit:
+                continue
+            dist = abs(nb // W - er) + abs(nb % W - ec)
+            if dist > left or (left - dist) & 1 or (nb == end) != (left == 0):
+                continue
+            cells[step] = nb
+            if left == 0:
+                paths.append((mask & ~(1 << start), tuple(cells)))
+                if len(paths) > limit:
+                    return None
+                continue
+            steps += 1
+            if budget is not None and steps > budget:
+                return None
+            mask |= bit
+            stack.append(iter(adjacency[nb]))
+            break
+        else:
+            stack.pop()
+            if stack:
+                mask &= ~(1 << cells[len(stack) - 1])
+    return paths
+
+def solve_zip_segments(input_grid, max_paths=2000, time_limit=None):
+    """Solve by joining memoized sub-paths between consecutive givens
+
+    Segment i runs from given nums[i] to the next given and needs a
+    simple path of exactly the number gap in steps. Its paths are
+    enumerated against the cells still free inside its reach and memoized
+    under that free set, so revisiting the same situation costs a lookup.
+    Segments are joined in order; a segment with no fitting path (or one
+    that strands a free cell) jumps straight back to the latest segment
+    involved in the conflict (conflict-directed backjumping) instead of
+    retrying every segment in between. An open tail after the last given
+    is finished by solve_zip_backtrack. Falls back to solve_zip when some
+    segment has more than max_paths paths (or takes more than
+    64 * max_paths steps to enumerate).
+
+    Raises ZipTimeout if time_limit seconds pass without an answer.
+    """
     H, W = len(input_grid), len(input_grid[0])
     target_num = H * W
+    givens = get_all_given_positions(input_grid)
+    if 1 not in givens:
+        return None
+    if not validate_givens_adjacency(givens, H, W):
+        return None
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+
+    adjacency = build_adjacency(H, W)
+    nums = sorted(givens)
+    given_mask = 0
+    for r, c in givens.values():
+        given_mask |= 1 << (r * W + c)
+    every = (1 << target_num) - 1
+
+    # Segment i runs from given nums[i] to given nums[i + 1]; its reach is
+    # every free cell close enough to both ends
+    segments = []
+    reach = []
+    for a, b in zip(nums, nums[1:]):
+        (ar, ac), (br, bc) = givens[a], givens[b]
+        segments.append((ar * W + ac, br * W + bc, b - a))
+        mask = 0
+        for cell in range(target_num):
+            r, c = divmod(cell, W)
+            if abs(r - ar) + abs(c - ac) + abs(r - br) + abs(c - bc) <= b - a:
+                mask |= 1 << cell
+        reach.append(mask & ~given_mask)
+    count = len(segments)
+    tail = nums[-1] < target_num
+    # later[i]: cells some segment after i (or the open tail) can still cover
+    later = [0] * (count + 1)
+    later[count] = every if tail else 0
+    for i in range(count - 1, -1, -1):
+        later[i] = later[i + 1] | reach[i]
+    free_cells = every & ~given_mask
+    # ends[i]: givens that still have a free path edge once segments 0..i are placed
+    ends = [0] * count
+    for i in range(count):
+        for num in nums[i + 1:]:
+            ends[i] |= 1 << (givens[num][0] * W + givens[num][1])
+    left_ok = right_ok = 0
+    for cell in range(target_num):
+        if cell % W:
+            left_ok |= 1 << cell
+        if cell % W != W - 1:
+            right_ok |= 1 << cell
+
+    def spread(mask):
+        """The four neighbor masks of every cell set in mask"""
+        return ((mask << W) & every, mask >> W,
+                (mask << 1) & left_ok, (mask >> 1) & right_ok)
+
+    memo = {}
+    owner = [-1] * target_num
+    choice = [-1] * count
+    placed = [False] * count
+    options = [None] * count
+    conflicts = [set() for _ in range(count)]
+    used = 0
+    used_at = [0] * (count + 1)
+
+    def compatible(i):
+        """Paths of segment i through the cells still free, memoized"""
+        key = (i, used & reach[i])
+        if key not in memo:
+            start, end, length = segments[i]
+            blocked = (given_mask & ~(1 << end)) | (used & reach[i])
+            memo[key] = segment_paths(start, end, length, blocked, adjacency, W, max_paths,
+                                      64 * max_paths)
+        return memo[key]
+
+    def blame(i):
+        """Segments owning a cell inside the reach of segment i"""
+        taken = used & reach[i]
+        while taken:
+            low = taken & -taken
+            conflicts[i].add(owner[low.bit_length() - 1])
+            taken ^= low
+
+    def assign(i, path, on):
+        for cell in path[1][:-1]:
+            owner[cell] = i if on else -1
+
+    def finish():
+        """Turn the chosen segments (plus a solved tail) into a solution"""
+        order = [givens[1]]
+        for i in range(count):
+            order.extend(divmod(cell, W) for cell in options[i][choice[i]][1])
+        if tail:
+            grid = [row[:] for row in input_grid]
+            order = solve_zip_backtrack(grid, len(order) + 1, target_num, order, givens,
+                                        deadline=deadline)
+            if order is None:
+                return None
+        return {i + 1: cell for i, cell in enumerate(order)}
+
+    def fallback():
+        """Plain search with whatever time is left"""
+        left = None if deadline is None else max(deadline - time.monotonic(), 0)
+        return solve_zip(input_grid, time_limit=left)
+
+    if count == 0:
+        return finish()
+
+    i = 0
+    options[0] = compatible(0)
+    if options[0] is None:
+        return fallback()
+    nodes = 0
+    while True:
+        nodes += 1
+        if deadline is not None and not nodes & 1023 and time.monotonic() > deadline:
+            raise ZipTimeout("Zip search timed out")
+        if placed[i]:
+            assign(i, options[i][choice[i]], False)
+            placed[i] = False
+            used = used_at[i]
+        choice[i] += 1
+        if choice[i] < len(options[i]):
+            path = options[i][choice[i]]
+            mask = path[0]
+            uncovered = free_cells & ~(used | mask) & ~later[i + 1]
+            if uncovered:
+                # Some free cell can only be covered by segments up to i
+                cell = (uncovered & -uncovered).bit_length() - 1
+                conflicts[i].update(j for j in range(i) if reach[j] >> cell & 1)
+                continue
+            # Every free cell needs two usable neighbors; only the tail's
+            # last cell may be a dead end
+            rest = free_cells & ~(used | mask)
+            a, b, c, d = spread(rest | ends[i])
+            dead = rest & ~((a & b) | (a & c) | (a & d) | (b & c) | (b & d) | (c & d))
+            if dead and (not tail or dead & (dead - 1)):
+                around = dead
+                for side in spread(dead):
+                    around |= side
+                conflicts[i].update(j for j in range(i) if reach[j] & around)
+                continue
+            assign(i, path, True)
+            placed[i] = True
+            used_at[i] = used
+            used |= mask
+            if i + 1 == count:
+                solution = finish()
+                if solution is not None:
+                    return solution
+                # Tail failed: blame every earlier segment
+                conflicts[i].update(range(i))
+                continue
+            i += 1
+            options[i] = compatible(i)
+            if options[i] is None:
+                return fallback()
+            choice[i] = -1
+            conflicts[i] = set()
+            continue
+        # Segment i is exhausted: jump back to its latest conflict
+        choice[i] = -1
+        blame(i)
+        conflicts[i].discard(i)
+        if not conflicts[i]:
+            return None
+        back = max(conflicts[i])
+        conflicts[back] |= conflicts[i] - {back}
+        for j in range(i - 1, back, -1):
+            assign(j, options[j][choice[j]], False)
+            placed[j] = False
+            choice[j] = -1
+        if back + 1 < i:
+            used = used_at[back + 1]
+        i = back
+
+def solve_zip(input_grid, time_limit=None, stats=None):
+    """Main solver function - returns path as dictionary {num: (r,c)}
+
+    stats (a SolverStats) is passed on to the backtracking search.
+    Raises ZipTimeout if time_limit seconds pass without an answer.
+    """
+    H, W = len(input_grid), len(input_grid[0])
     
-    # Create working copy
-    grid = [row[:] for row in input_grid]
-    givens = get_all_given_positions(grid)
+    givens = get_all_given_positions(input_grid)
     
     # Validate basic requirements
     if 1 not in givens:
@@ -130,31 +683,191 @@ def solve_zip(input_grid):
     if not validate_givens_adjacency(givens, H, W):
         return None  # Given numbers not properly connected
     
-    # Try direct backtracking first
-    result = solve_zip_backtrack(grid, 1, target_num, [], givens)
-    
-    if result is not None and len(result) == target_num:
-        solution = {}
-        for i, (r, c) in enumerate(result):
-            solution[i + 1] = (r, c)
-        return solution
-    
-    # If failed, try with random restarts
-    return solve_zip_with_restarts(input_grid, max_restarts=3)
+    # Luby-scheduled restarts; the first attempt is the plain backtracking
+    return solve_zip_with_restarts(input_grid, time_limit=time_limit, stats=stats)
 
-def hint_zip(input_grid):
-    """Provide a hint for the next move"""
-    solution = solve_zip(input_grid)
-    
-    if solution is None:
-        return None
-    
+def solve_zip_steps(input_grid, every=2000, node_limit=None, time_limit=None, seed=None):
+    """Stepping form of solve_zip for callers that must stay responsive
+
+    Runs the same restart schedule but hands control back every `every`
+    moves with a progress report, so a page can update its display between
+    steps, drop a stale search by closing the generator, or cap it with a
+    node or time budget. The final report's 'result' is the {num: (r, c)}
+    path or None (see solver_stats.stepped).
+    """
+    search = restart_search(input_grid, seed=seed, every=every)
+    return stepped(search, every, node_limit, time_limit)
+
+# Solved paths for recent boards: layout key -> [(r, c) of number 1, 2, ...]
+HINT_CACHE = OrderedDict()
+HINT_CACHE_SIZE = 32
+
+def hint_layout(grid):
+    """Cache key of a grid's numbers: (H, W, ((num, (r, c)), ...))"""
+    return (len(grid), len(grid[0]), tuple(sorted(get_all_given_positions(grid).items())))
+
+def first_disagreement(path, entries):
+    """Smallest number whose place in path contradicts the entries, or None"""
+    where = {cell: k + 1 for k, cell in enumerate(path)}
+    first = None
+    for num, cell in entries.items():
+        if num > len(path) or path[num - 1] != cell:
+            bad = min(num, where.get(cell, num))
+            if first is None or bad < first:
+                first = bad
+    return first
+
+def hint_zip(input_grid, givens=None, time_limit=None):
+    """Provide a hint for the next move
+
+    Solved paths are cached by the puzzle's givens layout (givens, a grid
+    holding only the puzzle's numbers, defaults to input_grid). While the
+    player's entries agree with the cached path the hint is read straight
+    from it; otherwise the search restarts from the cached path's prefix
+    before the first disagreeing number, and from scratch only if that
+    prefix cannot be completed. Raises ZipTimeout if time_limit seconds
+    pass without an answer.
+    """
+    deadline = None if time_limit is None else time.monotonic() + time_limit
     H, W = len(input_grid), len(input_grid[0])
-    
+    entries = get_all_given_positions(input_grid)
+    key = hint_layout(givens if givens is not None else input_grid)
+    path = HINT_CACHE.get(key)
+    if path is None:
+        # A board solved earlier whose numbers are a subset of these
+        for cached_key, cached in reversed(HINT_CACHE.items()):
+            h, w, layout = cached_key
+            if (h, w) == (H, W) and all(entries.get(num) == cell for num, cell in layout):
+                key, path = cached_key, cached
+                break
+
+    bad = 1 if path is None else first_disagreement(path, entries)
+    if bad is not None:
+        solved = None
+        if bad > 1:
+            grid = [row[:] for row in input_grid]
+            solved = solve_zip_backtrack(grid, bad, H * W, path[:bad - 1], entries,
+                                         deadline=deadline)
+        if solved is None:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            solution = solve_zip(input_grid, time_limit=remaining)
+            if solution is None:
+                return None
+            solved = [solution[num] for num in sorted(solution)]
+        path = solved
+        key = hint_layout(givens if givens is not None else input_grid)
+    HINT_CACHE[key] = path
+    HINT_CACHE.move_to_end(key)
+    while len(HINT_CACHE) > HINT_CACHE_SIZE:
+        HINT_CACHE.popitem(last=False)
+
     # Find the first empty cell in the solution path
-    for num in sorted(solution.keys()):
-        r, c = solution[num]
+    for num, (r, c) in enumerate(path, 1):
         if input_grid[r][c] == 0:
             return (num, (r, c))
-    
-    return None
\ No newline at end of file
+
+    return None
+
+# ---- Puzzle generation ----
+
+def random_hamiltonian_path(H, W, rng=None, moves=None):
+    """Random Hamiltonian path of an H x W grid as [(r, c), ...]
+
+    Starts from a serpentine and applies backbite moves: one end steps onto
+    a random neighbor and the stretch of path between them is reversed,
+    which keeps the path Hamiltonian. After enough moves (default
+    20 * H * W) the path is close to a uniform sample.
+    """
+    rng = rng or random.Random()
+    path = []
+    for r in range(H):
+        row = [(r, c) for c in range(W)]
+        path += row if r % 2 == 0 else row[::-1]
+    if len(path) < 3:
+        return path
+    for _ in range(moves or 20 * H * W):
+        if rng.random() < 0.5:
+            # Backbite at the tail: tail joins nb, path after nb is reversed
+            nb = rng.choice(list(neighbors(*path[-1], H, W)))
+            i = path.index(nb)
+            if i != len(path) - 2:
+                path[i + 1:] = path[:i:-1]
+        else:
+            # Backbite at the head, mirrored
+            nb = rng.choice(list(neighbors(*path[0], H, W)))
+            i = path.index(nb)
+            if i != 1:
+                path[:i] = path[i - 1::-1]
+    return path
+
+def count_zip_solutions(grid, limit=2, node_limit=None):
+    """Number of solutions of grid, stopping once limit are found
+
+    Raises ZipSearchLimit if node_limit moves are not enough to decide.
+    """
+    H, W = len(grid), len(grid[0])
+    givens = get_all_given_positions(grid)
+    if 1 not in givens or not validate_givens_adjacency(givens, H, W):
+        return 0
+    found = solve_zip_backtrack([row[:] for row in grid], 1, H * W, [], givens,
+                                node_limit=node_limit, limit=limit)
+    return len(found)
+
+def generate_puzzle(H, W, min_givens=1, rng=None, node_limit=None):
+    """Generate a Zip puzzle with a unique solution as an H x W grid (0 = empty)
+
+    A random Hamiltonian path is the answer. Givens (path numbers) are
+    added where a rival solution first leaves the path until the path is
+    the only solution, then removed again in random order while the
+    solution stays unique, keeping at least min_givens (number 1 always
+    stays). A uniqueness check that needs more than node_limit moves
+    (default 200 * H * W) counts as failed, which keeps generation fast at
+    the price of a few more givens on large boards.
+    """
+    rng = rng or random.Random()
+    total = H * W
+    node_limit = node_limit or 200 * total
+    path = random_hamiltonian_path(H, W, rng)
+
+    def board(nums):
+        grid = [[0] * W for _ in range(H)]
+        for num in nums:
+            r, c = path[num - 1]
+            grid[r][c] = num
+        return grid
+
+    def rivals(nums):
+        """Up to 2 solutions of the board, or None if the search was cut off"""
+        grid = board(nums)
+        try:
+            return solve_zip_backtrack(grid, 1, total, [], get_all_given_positions(grid),
+                                       node_limit=node_limit, limit=2)
+        except ZipSearchLimit:
+            return None
+
+    # Start from five evenly spaced waypoints including both ends; cheaper
+    # to check than a bare board, and removal strips what is not needed
+    spacing = max(1, (total - 1) // 4)
+    nums = set(range(1, total + 1, spacing)) | {total}
+    while True:
+        found = rivals(nums)
+        if found is not None and len(found) == 1:
+            break
+        if found:
+            other = next(sol for sol in found if sol != path)
+            nums.add(rng.choice([k + 1 for k in range(total) if other[k] != path[k]]))
+        else:
+            # Undecided: split the widest gap between consecutive givens
+            ordered = sorted(nums)
+            a, b = max(zip(ordered, ordered[1:]), key=lambda gap: gap[1] - gap[0])
+            nums.add((a + b) // 2)
+
+    removable = sorted(nums - {1})
+    rng.shuffle(removable)
+    for num in removable:
+        if len(nums) <= min_givens:
+            break
+        found = rivals(nums - {num})
+        if found is not None and len(found) == 1:
+            nums.discard(num)
+    return board(nums)
\ No newline at end of file